@@ -0,0 +1,115 @@
+"""
+Admission control for satellite status updates (/api/remote).
+
+  - a token bucket per satellite: RATE updates per second, bursts of BURST;
+    above that the hub answers 429 with Retry-After
+  - an update repeating the satellite's current card and status is dropped
+  - evaluations go through EvaluationQueue: at most one is waiting at any
+    time, and updates arriving while it waits are merged into it (it reads
+    the statuses when it runs, so it covers them), with at most WORKERS
+    evaluations fanning out LED calls at once
+
+So a reader or satellite gone haywire costs the hub a dict lookup per
+request, not a task and four HTTP calls. Every decision is counted in
+messe_remote_updates_total and messe_evaluations_total.
+"""
+import asyncio
+import logging
+import time
+
+from metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+RATE = 5.0   # updates per second and satellite
+BURST = 10
+WORKERS = 2
+
+remote_updates = Counter(
+    "messe_remote_updates_total", "Satellite status updates by admission result", ("satellite", "result"))
+evaluations = Counter(
+    "messe_evaluations_total", "LED evaluations requested, by queued or merged", ("result",))
+
+
+class TokenBucket:
+    def __init__(self, rate: float = RATE, burst: float = BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; 0 if allowed, else the seconds until the next one."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Admission:
+    def __init__(self, rate: float | None = RATE, burst: float = BURST):
+        """rate=None turns the rate limit off; duplicates are still dropped."""
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.last_ids = {}  # satellite -> card id of its last accepted update
+
+    def admit(self, satellite: str, card_id, status, current_status) -> tuple[str, float]:
+        """("accepted" | "duplicate" | "rate_limited", retry_after seconds)."""
+        wait = 0.0
+        if self.rate is not None:
+            bucket = self.buckets.get(satellite)
+            if bucket is None:
+                bucket = self.buckets[satellite] = TokenBucket(self.rate, self.burst)
+            wait = bucket.take()
+        if wait:
+            result = "rate_limited"
+        elif status == current_status and card_id == self.last_ids.get(satellite):
+            result = "duplicate"
+        else:
+            result = "accepted"
+            self.last_ids[satellite] = card_id
+        remote_updates.inc(satellite, result)
+        return result, wait
+
+
+class EvaluationQueue:
+    """Runs evaluate(trace) for submitted updates, collapsing the ones that pile up."""
+
+    def __init__(self, evaluate, workers: int = WORKERS):
+        self.evaluate = evaluate
+        self.workers = workers
+        self.queue = None
+        self.waiting = None  # the queued, not yet started request
+        self.tasks = []
+        self.merged = 0
+
+    def submit(self, trace: dict | None = None) -> None:
+        """Request an evaluation; call on the event loop."""
+        if self.queue is None:
+            # Started on first use, so it lives on the loop that serves the requests
+            self.queue = asyncio.Queue(maxsize=1)
+            self.tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        if self.waiting is not None:
+            # The waiting evaluation will see this update's status too
+            if trace is not None:
+                self.waiting["trace"] = trace
+            self.merged += 1
+            evaluations.inc("merged")
+            return
+        self.waiting = {"trace": trace}
+        self.queue.put_nowait(self.waiting)
+        evaluations.inc("queued")
+
+    async def _work(self) -> None:
+        while True:
+            request = await self.queue.get()
+            self.waiting = None
+            try:
+                await self.evaluate(request["trace"])
+            except Exception:
+                # One failed evaluation must not stop the worker
+                logger.exception("Evaluation failed")
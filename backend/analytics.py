@@ -0,0 +1,223 @@
+"""
+Live game statistics for the operator screen.
+
+The hub reports every finished round and every answer read at a station;
+the aggregates are updated in O(1) per event and GET /api/stats serves them
+from memory:
+  - rounds and the mean solve time from running sums, all time and today
+  - the median solve time from a P² quantile sketch (five markers, no
+    stored samples)
+  - fastest time today, rounds per hour for the last HOURS hours with rounds
+  - answers per station and status, and the resulting wrong-answer rate
+
+save() writes the aggregates to MESSE_STATS_PATH (default
+backend/analytics.json, empty to disable); the hub calls it periodically
+and load() continues from it after a restart.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from snapshot import write_atomic
+
+logger = logging.getLogger(__name__)
+
+STATS_PATH = os.environ.get("MESSE_STATS_PATH", os.path.join(os.path.dirname(__file__), "analytics.json"))
+
+HOURS = 24
+SAVE_INTERVAL = 60.0  # seconds
+
+
+class P2Quantile:
+    """Streaming estimate of one quantile (Jain & Chlamtac's P² algorithm)."""
+
+    def __init__(self, p: float = 0.5):
+        self.p = p
+        self.heights = []  # marker heights; the first five observations until they are sorted in
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float) -> None:
+        q = self.heights
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the middle markers towards their desired positions
+        n = self.positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolic = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if q[i - 1] < parabolic < q[i + 1]:
+                    q[i] = parabolic
+                else:
+                    q[i] = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def value(self) -> float | None:
+        q = self.heights
+        if not q:
+            return None
+        if len(q) < 5:
+            return q[min(len(q) - 1, int(self.p * len(q)))]
+        return q[2]
+
+    def to_dict(self) -> dict:
+        return {"p": self.p, "heights": list(self.heights), "positions": list(self.positions),
+                "desired": list(self.desired)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "P2Quantile":
+        sketch = cls(data["p"])
+        sketch.heights = data["heights"]
+        sketch.positions = data["positions"]
+        sketch.desired = data["desired"]
+        return sketch
+
+
+def today() -> str:
+    return time.strftime("%Y-%m-%d")
+
+
+def this_hour() -> str:
+    return time.strftime("%Y-%m-%dT%H")
+
+
+class Analytics:
+    def __init__(self, path: str | None):
+        self.path = path or None
+        # Rounds finish on the NFC thread as well as on the event loop
+        self.lock = threading.Lock()
+        self.rounds = 0
+        self.sum_ms = 0
+        self.median = P2Quantile(0.5)
+        self.day = today()
+        self.today = {"rounds": 0, "sum_ms": 0, "fastest_ms": None}
+        self.hourly = {}  # "YYYY-MM-DDTHH" -> rounds, the last HOURS hours with rounds
+        self.answers = {}  # station -> {status: count}
+        self.dirty = False
+
+    def _roll_day(self) -> None:
+        day = today()
+        if day != self.day:
+            self.day = day
+            self.today = {"rounds": 0, "sum_ms": 0, "fastest_ms": None}
+
+    def round_finished(self, duration_ms: int) -> None:
+        with self.lock:
+            self._roll_day()
+            self.rounds += 1
+            self.sum_ms += duration_ms
+            self.median.add(duration_ms)
+            self.today["rounds"] += 1
+            self.today["sum_ms"] += duration_ms
+            if self.today["fastest_ms"] is None or duration_ms < self.today["fastest_ms"]:
+                self.today["fastest_ms"] = duration_ms
+
+            hour = this_hour()
+            self.hourly[hour] = self.hourly.get(hour, 0) + 1
+            if len(self.hourly) > HOURS:
+                # Keys sort chronologically; only ever one too many
+                del self.hourly[min(self.hourly)]
+            self.dirty = True
+
+    def answer(self, station: str, status: str | None) -> None:
+        if status is None:
+            return
+        with self.lock:
+            counts = self.answers.setdefault(station, {})
+            counts[status] = counts.get(status, 0) + 1
+            self.dirty = True
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            self._roll_day()
+            median = self.median.value()
+            return {
+                "rounds": self.rounds,
+                "mean_ms": round(self.sum_ms / self.rounds) if self.rounds else None,
+                "median_ms": round(median) if median is not None else None,
+                "today": {
+                    "rounds": self.today["rounds"],
+                    "mean_ms": round(self.today["sum_ms"] / self.today["rounds"]) if self.today["rounds"] else None,
+                    "fastest_ms": self.today["fastest_ms"],
+                },
+                "rounds_this_hour": self.hourly.get(this_hour(), 0),
+                "rounds_per_hour": dict(sorted(self.hourly.items())),
+                "stations": {
+                    station: {
+                        "answers": sum(counts.values()),
+                        "wrong_rate": round(counts.get("wrong", 0) / sum(counts.values()), 3),
+                        **counts,
+                    }
+                    for station, counts in self.answers.items()
+                },
+            }
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {
+                "rounds": self.rounds,
+                "sum_ms": self.sum_ms,
+                "median": self.median.to_dict(),
+                "day": self.day,
+                "today": dict(self.today),
+                "hourly": dict(self.hourly),
+                "answers": {station: dict(counts) for station, counts in self.answers.items()},
+            }
+
+    def load(self) -> None:
+        if self.path is None:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable analytics file: {e}")
+            return
+        with self.lock:
+            self.rounds = data["rounds"]
+            self.sum_ms = data["sum_ms"]
+            self.median = P2Quantile.from_dict(data["median"])
+            self.day = data["day"]
+            self.today = data["today"]
+            self.hourly = data["hourly"]
+            self.answers = data["answers"]
+            self._roll_day()
+
+    def save(self) -> None:
+        """Write the aggregates if they changed since the last save."""
+        if self.path is None or not self.dirty:
+            return
+        self.dirty = False
+        try:
+            write_atomic(self.path, json.dumps(self.to_dict(), separators=(",", ":")))
+        except OSError as e:
+            self.dirty = True
+            logger.error(f"Analytics save failed: {e}")
+
+
+analytics = Analytics(STATS_PATH)
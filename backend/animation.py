@@ -0,0 +1,136 @@
+"""
+Declarative LED animations.
+
+The hub sends a timeline once with /api/idle-start and every LEDController
+renders it locally from the shared start timestamp, so new effects need no
+deploy and no per-frame network traffic.
+
+Timeline format (plain JSON):
+
+    {
+      "fps": 20,
+      "segments": [
+        {"duration": 30, "period": 1.571, "easing": "sine",
+         "keyframes": [[0, [0, 0, 0]], [0.785, [0, 0, 1]], [1.571, [0, 0, 0]]]},
+        {"duration": 5},
+        {"duration": 60, "period": 10, "easing": "step",
+         "keyframes": [[0, [0, 0, 1]], [1, [0, 0, 0]]],
+         "offsets": {"local": [0, 9], "stl1": [1, 8]}}
+      ]
+    }
+
+Segments play back to back and the timeline loops. Keyframes are
+[seconds, [r, g, b]] within one period (default: the segment duration);
+a segment without keyframes is dark. easing is linear, step or sine.
+offsets shift a station's copy of the segment by that many seconds; a list
+layers several copies (brightest channel wins), and a station missing from
+offsets stays dark for that segment.
+"""
+import math
+
+DEFAULT_FPS = 20
+MAX_FPS = 50
+EASINGS = ("linear", "step", "sine")
+OFF = (0.0, 0.0, 0.0)
+
+# Stations of the original installation, hub first
+DEFAULT_STATIONS = ("local", "stl1", "stl2", "stl3", "stl4")
+
+
+def _ease(easing: str, x: float) -> float:
+    if easing == "step":
+        return 0.0
+    if easing == "sine":
+        return (1 - math.cos(math.pi * x)) / 2
+    return x
+
+
+class Segment:
+    def __init__(self, data: dict, station: str):
+        self.duration = float(data["duration"])
+        if self.duration <= 0:
+            raise ValueError("segment duration must be positive")
+        self.period = float(data.get("period", self.duration))
+        if self.period <= 0:
+            raise ValueError("segment period must be positive")
+        self.easing = data.get("easing", "linear")
+        if self.easing not in EASINGS:
+            raise ValueError(f"unknown easing '{self.easing}'")
+
+        self.keyframes = []
+        for t, color in sorted(data.get("keyframes", []), key=lambda kf: kf[0]):
+            if len(color) != 3 or not all(0 <= c <= 1 for c in color):
+                raise ValueError("keyframe colours must be [r, g, b] between 0 and 1")
+            self.keyframes.append((float(t), tuple(float(c) for c in color)))
+
+        offsets = data.get("offsets")
+        if offsets is None:
+            self.offsets = [0.0]
+        elif not isinstance(offsets, dict):
+            raise ValueError("offsets must map stations to offsets")
+        else:
+            offset = offsets.get(station, [])
+            self.offsets = [float(o) for o in (offset if isinstance(offset, list) else [offset])]
+
+    def _sample(self, t: float) -> tuple[float, float, float]:
+        frames = self.keyframes
+        if t <= frames[0][0]:
+            return frames[0][1]
+        for (t0, c0), (t1, c1) in zip(frames, frames[1:]):
+            if t < t1:
+                x = _ease(self.easing, (t - t0) / (t1 - t0))
+                return tuple(a + (b - a) * x for a, b in zip(c0, c1))
+        return frames[-1][1]
+
+    def color_at(self, t: float) -> tuple[float, float, float]:
+        """Colour t seconds into this segment."""
+        if not self.keyframes or not self.offsets:
+            return OFF
+        layers = [self._sample((t - offset) % self.period) for offset in self.offsets]
+        return tuple(max(channel) for channel in zip(*layers))
+
+
+class Timeline:
+    """A timeline compiled for one station."""
+
+    def __init__(self, data: dict, station: str):
+        try:
+            self.segments = [Segment(segment, station) for segment in data["segments"]]
+            self.fps = min(float(data.get("fps", DEFAULT_FPS)), MAX_FPS)
+        except (KeyError, TypeError, IndexError, AttributeError) as e:
+            raise ValueError(f"invalid timeline: {e!r}")
+        if not self.segments:
+            raise ValueError("timeline has no segments")
+        if self.fps <= 0:
+            raise ValueError("fps must be positive")
+        self.duration = sum(segment.duration for segment in self.segments)
+
+    def color_at(self, elapsed: float) -> tuple[float, float, float]:
+        """Colour `elapsed` seconds after the shared start timestamp."""
+        t = elapsed % self.duration
+        for segment in self.segments:
+            if t < segment.duration:
+                return segment.color_at(t)
+            t -= segment.duration
+        return OFF
+
+
+def classic_timeline(stations=DEFAULT_STATIONS) -> dict:
+    """The original idle show: blue breathing, pause, runner across all stations, pause."""
+    breath = 2 * math.pi / 4  # sin(now * 4) of the old loop
+    # Runner goes out and back once per period; station i lights at i and on the way back
+    count = len(stations)
+    runner_period = 2 * count
+    offsets = {station: [i, runner_period - 1 - i] for i, station in enumerate(stations)}
+    return {
+        "fps": DEFAULT_FPS,
+        "segments": [
+            {"duration": 30, "period": round(breath, 4), "easing": "sine",
+             "keyframes": [[0, [0, 0, 0]], [round(breath / 2, 4), [0, 0, 1]], [round(breath, 4), [0, 0, 0]]]},
+            {"duration": 5},
+            {"duration": 60, "period": runner_period, "easing": "step",
+             "keyframes": [[0, [0, 0, 1]], [1, [0, 0, 0]]],
+             "offsets": offsets},
+            {"duration": 5},
+        ],
+    }
@@ -0,0 +1,198 @@
+"""
+Answer-set engine: which NFC UIDs count as correct at each station.
+
+A config holds one or more rounds (puzzle variants). Per station a round gives
+either a set of valid UIDs or an ordered sequence of UIDs:
+
+    {
+        "version": 2,
+        "round": "default",
+        "rounds": {
+            "default": {
+                "local": {"valid": ["584194412400"]},
+                "stl1": {"valid": ["584186924480", "584186924481"]},
+                "stl2": {"sequence": ["111", "222", "333"]}
+            }
+        }
+    }
+
+Stations missing from the active round fall back to their default UIDs.
+
+The hub numbers the versions: every change it accepts gets the next one,
+and satellites refuse a config older than theirs.
+"""
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+CORRECT = "correct"
+WRONG = "wrong"
+PARTIAL = "partial"  # right card in a sequence that is not finished yet
+
+
+class StationAnswer:
+    def __init__(self, valid=(), sequence=()):
+        self.valid = frozenset(str(uid) for uid in valid)
+        self.sequence = tuple(str(uid) for uid in sequence)
+        # uid -> positions in the sequence, for O(1) lookups
+        self.positions = {}
+        for index, uid in enumerate(self.sequence):
+            self.positions.setdefault(uid, set()).add(index)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StationAnswer":
+        valid = data.get("valid", ())
+        sequence = data.get("sequence", ())
+        if not isinstance(valid, (list, tuple)) or not isinstance(sequence, (list, tuple)):
+            raise ValueError("'valid' and 'sequence' must be lists of UIDs")
+        if not valid and not sequence:
+            raise ValueError("station needs 'valid' or 'sequence'")
+        return cls(valid, sequence)
+
+    def to_dict(self) -> dict:
+        if self.sequence:
+            return {"sequence": list(self.sequence)}
+        return {"valid": sorted(self.valid)}
+
+
+class AnswerConfig:
+    """Immutable snapshot of a parsed config; replaced as a whole on reload."""
+
+    def __init__(self, version: int, round_name: str, rounds: dict):
+        self.version = version
+        self.round = round_name
+        self.rounds = rounds  # round -> station -> StationAnswer
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AnswerConfig":
+        if not isinstance(data, dict):
+            raise ValueError("config must be an object")
+        raw_rounds = data.get("rounds", {})
+        if not isinstance(raw_rounds, dict):
+            raise ValueError("'rounds' must map round names to stations")
+        rounds = {}
+        for round_name, stations in raw_rounds.items():
+            if not isinstance(stations, dict):
+                raise ValueError(f"round '{round_name}' must map stations to answers")
+            for station, answer in stations.items():
+                if not isinstance(answer, dict):
+                    raise ValueError(f"answer of station '{station}' must be an object")
+            rounds[round_name] = {station: StationAnswer.from_dict(answer)
+                                  for station, answer in stations.items()}
+        round_name = data.get("round", "default")
+        if not isinstance(round_name, str):
+            raise ValueError("'round' must be a round name")
+        if rounds and round_name not in rounds:
+            raise ValueError(f"unknown round '{round_name}'")
+        version = data.get("version", 0)
+        if isinstance(version, bool) or not isinstance(version, (int, str)):
+            raise ValueError("'version' must be an integer")
+        return cls(int(version), round_name, rounds)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "round": self.round,
+            "rounds": {
+                round_name: {station: answer.to_dict() for station, answer in stations.items()}
+                for round_name, stations in self.rounds.items()
+            },
+        }
+
+
+class AnswerEngine:
+    def __init__(self, path: str, defaults: dict[str, str]):
+        """defaults maps station -> the UID used when no config covers it."""
+        self.path = path
+        self.defaults = {station: StationAnswer(valid=[uid]) for station, uid in defaults.items()}
+        self.config = AnswerConfig(0, "default", {})
+        self.progress = {}  # station -> next index in its sequence
+        self.lock = threading.Lock()
+
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.config = AnswerConfig.from_dict(json.load(f))
+                logger.info(f"Loaded answers v{self.config.version} (round {self.config.round})")
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to load {path}, using defaults: {e}")
+
+    def _station(self, station: str) -> StationAnswer | None:
+        config = self.config
+        answer = config.rounds.get(config.round, {}).get(station)
+        return answer if answer is not None else self.defaults.get(station)
+
+    def check(self, station: str, nfc_id) -> str | None:
+        """Classify nfc_id at station as CORRECT, WRONG or PARTIAL."""
+        if not nfc_id:
+            return None
+        nfc_id = str(nfc_id)
+
+        answer = self._station(station)
+        if answer is None:
+            return WRONG
+
+        if not answer.sequence:
+            return CORRECT if nfc_id in answer.valid else WRONG
+
+        with self.lock:
+            index = self.progress.get(station, 0)
+            if index in answer.positions.get(nfc_id, ()):
+                index += 1
+            elif 0 in answer.positions.get(nfc_id, ()):
+                # Wrong order, but a valid first card starts over
+                index = 1
+            else:
+                self.progress[station] = 0
+                return WRONG
+
+            if index >= len(answer.sequence):
+                self.progress[station] = len(answer.sequence)
+                return CORRECT
+            self.progress[station] = index
+            return PARTIAL
+
+    def solution(self, station: str) -> list[str]:
+        """UIDs that solve station, in the order they have to be presented."""
+        answer = self._station(station)
+        if answer is None:
+            return []
+        return list(answer.sequence) if answer.sequence else sorted(answer.valid)[:1]
+
+    def reset_progress(self) -> None:
+        with self.lock:
+            self.progress.clear()
+
+    def load(self, data: dict, bump_version: bool = False) -> AnswerConfig:
+        """Validate, persist and swap in a new config.
+
+        With bump_version the config gets the next version number instead of
+        its own, so satellites that report an older one are caught up. Raises
+        ValueError if invalid, OSError if it could not be written.
+        """
+        config = AnswerConfig.from_dict(data)
+        if bump_version:
+            config = AnswerConfig(self.config.version + 1, config.round, config.rounds)
+        self._save(config)
+        with self.lock:
+            self.config = config
+            self.progress.clear()
+        logger.info(f"Answers reloaded: v{config.version} (round {config.round})")
+        return config
+
+    def select_round(self, round_name: str) -> AnswerConfig:
+        data = self.config.to_dict()
+        data["round"] = round_name
+        return self.load(data, bump_version=True)
+
+    def _save(self, config: AnswerConfig) -> None:
+        # Write to a temp file and rename, so a crash never leaves half a config
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(config.to_dict(), f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
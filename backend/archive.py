@@ -0,0 +1,171 @@
+"""
+Streaming export and import of the score tables.
+
+Export reads the table in id order, BATCH_SIZE rows per query (keyset
+pagination, so no read transaction is held while a slow client downloads),
+and streams them as NDJSON or CSV. Import parses the request body line by
+line and inserts BATCH_SIZE rows per transaction. Memory use does not depend
+on the number of rows either way, so a whole season can be archived from
+and restored to the Pi.
+
+    curl -o season.ndjson http://hub:8080/api/export/all_scores
+    curl -o season.csv "http://hub:8080/api/export/all_scores?format=csv"
+    curl --data-binary @season.ndjson http://hub:8080/api/import/all_scores
+
+Imported rows get new ids; created_at is kept when it is present.
+"""
+import csv
+import io
+import json
+import re
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from db import SCORE_TABLES, db
+
+COLUMNS = ("id", "name", "time", "created_at")
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 20
+
+TIME_FORMAT = re.compile(r"^\d{2}:\d{2}:\d{2}\.\d{3}$")
+
+
+def check_table(table: str, fmt: str) -> None:
+    if table not in SCORE_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table {table}")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+
+
+def iter_rows(table: str):
+    """All rows of table in id order, one short query per batch."""
+    last_id = -1
+    while True:
+        with db.get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT id, name, time, created_at FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, BATCH_SIZE)).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]["id"]
+
+
+def export_ndjson(table: str):
+    for rows in iter_rows(table):
+        yield "".join(json.dumps(dict(row), ensure_ascii=False) + "\n" for row in rows)
+
+
+def export_csv(table: str):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for rows in iter_rows(table):
+        writer.writerows(tuple(row) for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():  # header of an empty table
+        yield buffer.getvalue()
+
+
+async def iter_lines(request: Request):
+    """Lines of the request body as it arrives."""
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8", errors="replace").rstrip("\r")
+
+
+async def iter_records(request: Request, fmt: str):
+    """(line number, dict) per record; the dict is None if the record cannot be parsed."""
+    number = 0
+    if fmt == "ndjson":
+        async for line in iter_lines(request):
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            yield number, record if isinstance(record, dict) else None
+        return
+
+    header = None
+    record = ""
+    async for line in iter_lines(request):
+        number += 1
+        # A quoted field may contain newlines; a record is complete once its quotes are balanced
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        fields, record = next(csv.reader([record]), []), ""
+        if header is None:
+            header = fields
+        elif fields:
+            yield number, dict(zip(header, fields)) if len(fields) == len(header) else None
+    if record:
+        yield number, None
+
+
+def validate(record: dict | None) -> tuple | None:
+    """(name, time, created_at) of an importable record, else None."""
+    if record is None:
+        return None
+    name, time_text = record.get("name"), record.get("time")
+    if not isinstance(name, str) or not name or not isinstance(time_text, str) or not TIME_FORMAT.match(time_text):
+        return None
+    return name, time_text, record.get("created_at") or None
+
+
+def insert_batch(table: str, rows: list[tuple]) -> None:
+    with db.get_connection() as conn:
+        conn.executemany(
+            f"INSERT INTO {table} (name, time, created_at) VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP))",
+            rows)
+        conn.commit()
+
+
+def add_routes(app) -> None:
+    """Add the /api/export and /api/import endpoints to app."""
+
+    @app.get("/api/export/{table}")
+    async def export_table(table: str, format: str = "ndjson"):
+        check_table(table, format)
+        rows = export_ndjson(table) if format == "ndjson" else export_csv(table)
+        # Sync generators are iterated in the thread pool, off the event loop
+        return StreamingResponse(rows, media_type=FORMATS[format], headers={
+            "Content-Disposition": f'attachment; filename="{table}.{format}"'})
+
+    @app.post("/api/import/{table}")
+    async def import_table(table: str, request: Request, format: str = "ndjson"):
+        check_table(table, format)
+        imported = 0
+        invalid = 0
+        errors = []  # line numbers of the first invalid records
+        batch = []
+        async for number, record in iter_records(request, format):
+            row = validate(record)
+            if row is None:
+                invalid += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(number)
+                continue
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                await run_in_threadpool(insert_batch, table, batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            await run_in_threadpool(insert_batch, table, batch)
+            imported += len(batch)
+        return {"message": f"Imported {imported} rows into {table}", "imported": imported,
+                "invalid": invalid, "invalid_lines": errors}
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Deterministic load test and benchmark harness for the hub.
+
+Boots server.app in-process with simulated hardware, runs its startup hook
+(so the local card reader, buzzer and local NFC processor run as on the
+fair), replaces the satellites with an in-process httpx transport and drives
+N simulated satellites as asyncio tasks plus the local reader. Latency
+percentiles are written as JSON so runs of different versions can be compared.
+
+    cd backend
+    python benchmark.py --satellites 4 --rounds 20 --out bench.json
+    python benchmark.py --sizes 1000,100000,1000000 --skip-game
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+# Must be set before the hub is imported
+os.environ.setdefault("MESSE_HARDWARE", "sim")
+os.environ.setdefault("MESSE_LOG_LEVEL", "WARNING")
+os.environ.setdefault("MESSE_JOURNAL", "")
+os.environ.setdefault("MESSE_STATE_PATH", "")
+os.environ.setdefault("MESSE_STATS_PATH", "")
+_db_dir = tempfile.mkdtemp(prefix="messe-bench-")
+os.environ.setdefault("MESSE_DB_PATH", os.path.join(_db_dir, "game.sqlite"))
+# The local reader is driven from this process
+os.environ["MESSE_HW_PROCESS"] = "0"
+
+import httpx  # noqa: E402
+
+import nfc_reader  # noqa: E402
+import server  # noqa: E402
+
+CORRECT = server.CORRECT_ID
+WRONG = "1"
+POLL = 0.001  # seconds between checks while waiting for the local NFC processor
+
+
+def summarize(samples_ms: list[float]) -> dict:
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+
+    def rank(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": rank(0.50),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+class SimulatedSatellites:
+    """Answers the hub's satellite calls in-process and timestamps them."""
+
+    def __init__(self):
+        self.waiters = []  # [path prefix, pending names, since, future]
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        now = time.perf_counter()
+        name = request.url.host.split(".")[0]
+        path = request.url.path
+        for waiter in list(self.waiters):
+            prefix, pending, since, future = waiter
+            if future.done():  # cancelled: the update it waited for was not admitted
+                self.waiters.remove(waiter)
+                continue
+            if path.startswith(prefix) and now >= since:
+                pending.discard(name)
+                if not pending and not future.done():
+                    future.set_result(now)
+                    self.waiters.remove(waiter)
+        if path == "/api/clock":
+            return httpx.Response(200, json={"wall": time.time(), "mono": time.monotonic()})
+        return httpx.Response(200, json={"message": "ok", "trace": None})
+
+    def expect(self, prefix: str, names, since: float) -> asyncio.Future:
+        """Future resolving to the time the last of names received a call under prefix."""
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append([prefix, set(names), since, future])
+        return future
+
+
+class Bench:
+    def __init__(self, satellites: int, seed: int):
+        self.names = [f"stl{i}" for i in range(1, satellites + 1)]
+        self.rng = random.Random(seed)
+        self.sim = SimulatedSatellites()
+        self.remote_ms = {}
+        self.shed = {}  # scenario -> updates refused with 429 by the hub's admission control
+        self.fanout_ms = []
+        self.win_fanout_ms = []
+        self.unlock_ms = []
+        self.local_fanout_ms = []
+
+        # Point the hub at N in-process satellites
+        server.SATELLITES[:] = self.names
+        server.statuses.clear()
+        server.statuses.update({"local": None, **{name: None for name in self.names}})
+        server.satellite_transport = httpx.MockTransport(self.sim.handle)
+        self.hub = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app),
+                                     base_url="http://hub")
+
+    async def post_status(self, scenario: str, station: str, status, nfc_id=None) -> bool:
+        """True if the hub took the update (not rate-limited or a duplicate).
+
+        The local station is played on the simulated reader instead.
+        """
+        if station == "local":
+            await self.tap_local(status)
+            return True
+        started = time.perf_counter()
+        response = await self.hub.post("/api/remote", json={
+            "satellite": station, "id": nfc_id, "status": status})
+        self.remote_ms.setdefault(scenario, []).append((time.perf_counter() - started) * 1000)
+        if response.status_code == 429:
+            self.shed[scenario] = self.shed.get(scenario, 0) + 1
+            return False
+        response.raise_for_status()
+        return response.json()["message"] == "Status updated"
+
+    async def tap_local(self, status) -> None:
+        """Put the card for status on the local reader (None: take it off) and wait until the hub read it."""
+        reader = nfc_reader.get_reader()
+        if status is None:
+            reader.remove()
+        else:
+            reader.present(CORRECT if status == "correct" else WRONG)
+        deadline = time.monotonic() + 5
+        while server.statuses["local"] != status:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"local reader: status {status} not seen within 5s")
+            await asyncio.sleep(POLL)
+
+    async def start_round(self) -> None:
+        # Card off the reader and hub idle for a moment, so the local NFC processor
+        # forgets the last round's card (it checks every 0.1 s while idle)
+        server.game_active = False
+        nfc_reader.get_reader().remove()
+        server.clear_nfc()
+        await asyncio.sleep(0.15)
+        for key in server.statuses:
+            server.statuses[key] = None
+        server.all_statuses_initialized = False
+        server.admission.buckets.clear()  # each scenario starts with full token buckets
+        server.game_active = True
+
+    async def jitter(self, max_ms: float) -> None:
+        await asyncio.sleep(self.rng.uniform(0, max_ms) / 1000)
+
+    # ----------------------
+    # Scenarios
+    # ----------------------
+    async def rapid_swaps(self, rounds: int, swaps: int) -> None:
+        """Every station holds a wrong card, then satellites swap cards quickly."""
+        for _ in range(rounds):
+            await self.start_round()
+            await asyncio.gather(*(self.post_status("rapid_swaps", station, "wrong", WRONG)
+                                   for station in server.statuses))
+            for swap in range(swaps):
+                station = self.rng.choice(self.names)
+                status = self.rng.choice(["wrong", "correct"])
+                since = time.perf_counter()
+                done = self.sim.expect("/led/", self.names, since)
+                if not await self.post_status("rapid_swaps", station, status, f"swap{swap}"):
+                    done.cancel()
+                    continue
+                self.fanout_ms.append((await asyncio.wait_for(done, 5) - since) * 1000)
+                await self.jitter(20)
+        server.game_active = False
+
+    async def flapping(self, rounds: int, flaps: int) -> None:
+        """One reader flaps between a card and no card while the others send normal updates."""
+        async def flapper(station):
+            for i in range(flaps):
+                await self.post_status("flapping", station, "wrong" if i % 2 == 0 else None)
+                await self.jitter(5)
+
+        async def steady(station):
+            for _ in range(flaps // 10):
+                await self.post_status("flapping", station, "wrong", WRONG)
+                await self.jitter(50)
+
+        for _ in range(rounds):
+            await self.start_round()
+            flapping_station = self.rng.choice(self.names)
+            await asyncio.gather(flapper(flapping_station),
+                                 *(steady(s) for s in server.statuses if s != flapping_station))
+        server.game_active = False
+        await asyncio.sleep(0.2)  # let the last evaluations drain
+
+    async def simultaneous_wins(self, rounds: int) -> None:
+        """All stations report correct at once; waits for the hub's post-win reset."""
+        for _ in range(rounds):
+            await self.start_round()
+            since = time.perf_counter()
+            done = self.sim.expect("/led/green", self.names, since)
+            locked = self.sim.expect("/api/lock", self.names, since)
+            await asyncio.gather(*(self.post_status("simultaneous_wins", station, "correct", CORRECT)
+                                   for station in server.statuses))
+            self.win_fanout_ms.append((await asyncio.wait_for(done, 5) - since) * 1000)
+            await asyncio.wait_for(locked, 10)
+            await asyncio.sleep(0.1)
+
+    async def local_taps(self, rounds: int, taps: int) -> None:
+        """Cards swapped on the local reader until every satellite got its LED command."""
+        reader = nfc_reader.get_reader()
+        for _ in range(rounds):
+            await self.start_round()
+            await asyncio.gather(*(self.post_status("local_taps", station, "wrong", WRONG)
+                                   for station in server.statuses))
+            for tap in range(taps):
+                since = time.perf_counter()
+                done = self.sim.expect("/led/", self.names, since)
+                reader.present(CORRECT if tap % 2 == 0 else WRONG)
+                self.local_fanout_ms.append((await asyncio.wait_for(done, 5) - since) * 1000)
+                await self.jitter(20)
+        server.game_active = False
+
+    async def buzzer_unlock(self, rounds: int) -> None:
+        """Buzzer edge until every satellite has been unlocked."""
+        for _ in range(rounds):
+            since = time.perf_counter()
+            done = self.sim.expect("/api/unlock", self.names, since)
+            await server.on_buzzer_edge(True)
+            self.unlock_ms.append((await asyncio.wait_for(done, 5) - since) * 1000)
+            await server.on_buzzer_edge(False)
+            server.game_active = False
+
+    async def leaderboard_reads(self, sizes: list[int], reads: int) -> dict:
+        results = {}
+        for size in sizes:
+            path = os.path.join(_db_dir, f"leaderboard-{size}.sqlite")
+            fill_scores(path, size, self.rng)
+            server.db.db_path = path
+            per_route = {}
+            for route in ("/api/leaderboard", "/api/leaderAll"):
+                samples = []
+                for _ in range(reads):
+                    started = time.perf_counter()
+                    response = await self.hub.get(route)
+                    response.raise_for_status()
+                    samples.append((time.perf_counter() - started) * 1000)
+                per_route[route] = summarize(samples)
+            results[str(size)] = per_route
+        return results
+
+
+def fill_scores(path: str, size: int, rng: random.Random) -> None:
+    """Create a scores database with size rows in users and in all_scores."""
+    if os.path.exists(path):
+        os.remove(path)
+    server.db.db_path = path
+    server.db._init_db()
+    conn = sqlite3.connect(path)
+    rows = ((f"player{i}", f"00:{rng.randrange(60):02d}:{rng.randrange(60):02d}.{rng.randrange(1000):03d}")
+            for i in range(size))
+    with conn:
+        conn.executemany("INSERT INTO users (name, time) VALUES (?, ?)", rows)
+        conn.execute("INSERT INTO all_scores (name, time, created_at) SELECT name, time, created_at FROM users")
+    conn.close()
+
+
+def git_version() -> str | None:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True,
+                              text=True, check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def start_hub() -> None:
+    """Wait for the subsystems the startup hook brings up; the game scenarios need the reader."""
+    deadline = time.monotonic() + 10
+    while any(entry["state"] == "pending" for entry in server.readiness.subsystems.values()):
+        if time.monotonic() > deadline:
+            raise RuntimeError("hub subsystems not up within 10s")
+        await asyncio.sleep(0.01)
+    if nfc_reader.reader is None:
+        raise RuntimeError(f"simulated reader did not start: {server.readiness.subsystems.get('nfc')}")
+
+
+async def run(args) -> dict:
+    bench = Bench(args.satellites, args.seed)
+    results = {}
+    # The startup and shutdown hooks, as under uvicorn
+    async with server.app.router.lifespan_context(server.app):
+        await start_hub()
+        if not args.skip_game:
+            await bench.rapid_swaps(args.rounds, swaps=10)
+            await bench.flapping(args.rounds, flaps=100)
+            await bench.simultaneous_wins(args.win_rounds)
+            await bench.local_taps(args.rounds, taps=10)
+            await bench.buzzer_unlock(args.rounds)
+            results["remote_handling"] = {scenario: summarize(samples)
+                                          for scenario, samples in bench.remote_ms.items()}
+            results["remote_shed"] = bench.shed
+            results["led_fanout"] = summarize(bench.fanout_ms)
+            results["win_fanout"] = summarize(bench.win_fanout_ms)
+            results["local_to_led"] = summarize(bench.local_fanout_ms)
+            results["buzzer_to_unlock"] = summarize(bench.unlock_ms)
+        if args.sizes:
+            results["leaderboard_reads"] = await bench.leaderboard_reads(args.sizes, args.reads)
+        await bench.hub.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hub load test with simulated satellites")
+    parser.add_argument("--satellites", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--win-rounds", type=int, default=3, help="each takes ~3 s (hub reset delay)")
+    parser.add_argument("--sizes", default="1000,100000,1000000",
+                        help="leaderboard row counts, comma separated; empty to skip")
+    parser.add_argument("--reads", type=int, default=5, help="reads per leaderboard size and route")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-game", action="store_true", help="only run the leaderboard reads")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",") if size]
+
+    started = time.time()
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutil.rmtree(_db_dir, ignore_errors=True)
+    report = {
+        "meta": {
+            "version": git_version(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "satellites": args.satellites,
+            "rounds": args.rounds,
+            "seed": args.seed,
+            "started": started,
+            "duration_s": round(time.time() - started, 3),
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["results"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+NTP-style clock offset estimation between the hub and its satellites.
+
+The fair LAN has no NTP server, so the hub probes every satellite's
+/api/clock, records (offset, round-trip time) per probe and keeps a small
+window of samples per node. As in NTP's clock filter, the sample with the
+lowest round-trip time wins: it has the least room for asymmetric delay.
+
+    offset = remote_clock - (local_before + local_after) / 2
+
+Offsets are kept for the wall clock (shared effect timestamps) and for the
+monotonic clock (latency traces). offset > 0 means the satellite is ahead.
+"""
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+SAMPLES = 8            # window per node
+INTERVAL = 2.0         # seconds between probe rounds once synchronised
+BURST_INTERVAL = 0.1   # seconds between the first SAMPLES rounds
+MAX_RTT = 0.5          # probes slower than this are discarded
+STEP = 0.5             # an offset jump this large (clock set, service restart) restarts the window
+
+
+class PeerClock:
+    def __init__(self, size: int = SAMPLES):
+        self.samples = deque(maxlen=size)  # (rtt, wall offset, monotonic offset, taken)
+        self.errors = 0
+
+    def add(self, rtt: float, wall_offset: float, mono_offset: float) -> None:
+        best = self.best()
+        if best and (abs(wall_offset - best[1]) > STEP or abs(mono_offset - best[2]) > STEP):
+            self.samples.clear()
+        self.samples.append((rtt, wall_offset, mono_offset, time.monotonic()))
+
+    def best(self):
+        return min(self.samples, key=lambda sample: sample[0]) if self.samples else None
+
+    @property
+    def wall_offset(self) -> float | None:
+        best = self.best()
+        return best[1] if best else None
+
+    @property
+    def mono_offset(self) -> float | None:
+        best = self.best()
+        return best[2] if best else None
+
+    def snapshot(self) -> dict:
+        best = self.best()
+        if best is None:
+            return {"synced": False, "errors": self.errors}
+        offsets = [sample[1] for sample in self.samples]
+        return {
+            "synced": True,
+            "offset_ms": round(best[1] * 1000, 3),
+            "rtt_ms": round(best[0] * 1000, 3),
+            "jitter_ms": round(statistics.pstdev(offsets) * 1000, 3),
+            "samples": len(self.samples),
+            "age_s": round(time.monotonic() - best[3], 3),
+            "errors": self.errors,
+        }
+
+
+class ClockSync:
+    """Filtered clock offsets for a (mutable) list of node names."""
+
+    def __init__(self, peers: list[str]):
+        self.peers = peers
+        self.clocks = {}
+
+    def clock(self, name: str) -> PeerClock:
+        clock = self.clocks.get(name)
+        if clock is None:
+            clock = self.clocks[name] = PeerClock()
+        return clock
+
+    def to_peer_wall(self, name: str, timestamp: float) -> float:
+        """Convert a hub wall-clock timestamp to the satellite's clock (unchanged if unknown)."""
+        offset = self.clock(name).wall_offset
+        return timestamp + offset if offset is not None else timestamp
+
+    def mono_offset(self, name: str) -> float | None:
+        return self.clock(name).mono_offset
+
+    async def measure(self, name: str, probe) -> None:
+        """One probe; probe(name) must return the satellite's {"wall", "mono"}."""
+        clock = self.clock(name)
+        wall_before, mono_before = time.time(), time.monotonic()
+        try:
+            remote = await probe(name)
+        except Exception as e:
+            clock.errors += 1
+            logger.debug(f"Clock probe failed for {name}: {e}")
+            return
+        mono_after = time.monotonic()
+        wall_after = time.time()
+
+        rtt = mono_after - mono_before
+        if rtt > MAX_RTT:
+            return
+        clock.add(rtt,
+                  remote["wall"] - (wall_before + wall_after) / 2,
+                  remote["mono"] - (mono_before + mono_after) / 2)
+
+    async def run(self, probe, interval: float = INTERVAL) -> None:
+        """Probe all peers forever; run as a task."""
+        rounds = 0
+        while True:
+            # One at a time, so no probe waits on the event loop behind another
+            for name in list(self.peers):
+                await self.measure(name, probe)
+            rounds += 1
+            # Fill the window quickly after startup, then probe at a relaxed pace
+            await asyncio.sleep(BURST_INTERVAL if rounds < SAMPLES else interval)
+
+    def snapshot(self) -> dict:
+        return {name: self.clock(name).snapshot() for name in self.peers}
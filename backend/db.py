@@ -1,14 +1,54 @@
+import re
 import sqlite3
 import os
+import threading
+import time
 from contextlib import contextmanager
 
+from metrics import db_query_seconds
+
+SCORE_TABLES = ("users", "all_scores")
+CHANGE_LOG_SIZE = 1000  # score changes kept for leaderboard delta sync
+
+def _statement_label(sql):
+    # One label per statement shape: collapse whitespace and IN (?,?,...) lists
+    sql = " ".join(re.sub(r"--[^\n]*", "", sql).split())
+    return re.sub(r"\((\?\s*,\s*)+\?\)", "(?...)", sql)[:120]
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            db_query_seconds.observe(_statement_label(sql), value=time.perf_counter() - started)
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose execute() and cursors record per-statement durations."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
 class Database:
+    """The schema is created on first use (or by init() at startup), not at import."""
+
     def __init__(self):
-        self.db_path = os.path.join(os.path.dirname(__file__), 'db.sqlite')
-        self._init_db()
+        self.db_path = os.environ.get("MESSE_DB_PATH") or os.path.join(os.path.dirname(__file__), 'db.sqlite')
+        self.ready = False
+        self.fts = False
+        self._init_lock = threading.Lock()
+
+    def init(self):
+        with self._init_lock:
+            if not self.ready:
+                self._init_db()
+                self.ready = True
 
     def _init_db(self):
-        with self.get_connection() as conn:
+        with self._connect() as conn:
             conn.execute('''
                          CREATE TABLE IF NOT EXISTS users (
                                                               id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -25,16 +65,87 @@ class Database:
                                                                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                          )
                          ''')
+            for table in SCORE_TABLES:
+                # Times are fixed-width HH:MM:SS.mmm, so text order is time order
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_time ON {table} (time, id)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created ON {table} (created_at, id)")
+            self.fts = all(self._init_fts(conn, table) for table in SCORE_TABLES)
+            self._init_change_log(conn)
             conn.commit()
 
+    def _init_change_log(self, conn):
+        """Versioned log of score changes, written by triggers so every writer is covered.
+
+        version only grows (AUTOINCREMENT); the log keeps the last CHANGE_LOG_SIZE entries.
+        """
+        conn.execute('''
+                     CREATE TABLE IF NOT EXISTS score_changes (
+                         version INTEGER PRIMARY KEY AUTOINCREMENT,
+                         tbl TEXT NOT NULL,
+                         row_id INTEGER NOT NULL,
+                         old_time TEXT,
+                         new_time TEXT
+                     )
+                     ''')
+        for table in SCORE_TABLES:
+            for event, old_time, new_time in (("INSERT", "NULL", "new.time"),
+                                              ("DELETE", "old.time", "NULL"),
+                                              ("UPDATE OF name, time", "old.time", "new.time")):
+                row = "old.id" if event == "DELETE" else "new.id"
+                conn.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS {table}_change_{event.split()[0].lower()}
+                    AFTER {event} ON {table} BEGIN
+                        INSERT INTO score_changes (tbl, row_id, old_time, new_time)
+                        VALUES ('{table}', {row}, {old_time}, {new_time});
+                        DELETE FROM score_changes WHERE version <= last_insert_rowid() - {CHANGE_LOG_SIZE};
+                    END
+                ''')
+
+    def _init_fts(self, conn, table):
+        """Name search index for table, kept in sync by triggers; False without FTS5."""
+        fts = f"{table}_fts"
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (fts,)).fetchone()
+        try:
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                    name, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')
+            """)
+        except sqlite3.OperationalError:  # SQLite built without FTS5
+            return False
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts} (rowid, name) VALUES (new.id, new.name);
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, name) VALUES ('delete', old.id, old.name);
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF name ON {table} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, name) VALUES ('delete', old.id, old.name);
+                INSERT INTO {fts} (rowid, name) VALUES (new.id, new.name);
+            END
+        """)
+        if not exists:
+            # Index the rows written before the index existed
+            conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+        return True
+
 
     @contextmanager
-    def get_connection(self):
-        conn = sqlite3.connect(self.db_path)
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, factory=TimedConnection)
         conn.row_factory = sqlite3.Row
         try:
             yield conn
         finally:
             conn.close()
 
+    def get_connection(self):
+        if not self.ready:
+            self.init()
+        return self._connect()
+
 db = Database()
\ No newline at end of file
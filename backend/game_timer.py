@@ -0,0 +1,101 @@
+"""
+Server-authoritative game timing.
+
+A round starts at the buzzer edge and ends when the last correct status
+reaches the hub's game state. Both instants are taken with
+time.monotonic_ns on the hub, so the stored time does not depend on the
+kiosk browser or its polling.
+
+speed is the time factor of a simulation (simulation.py): durations are
+reported in simulated time, the timestamps stay monotonic_ns.
+"""
+import threading
+import time
+
+
+def to_ns(ts: float | None) -> int:
+    """Monotonic seconds (e.g. an event timestamp) as nanoseconds; now if None."""
+    return time.monotonic_ns() if ts is None else int(ts * 1_000_000_000)
+
+
+def format_duration(ms: int) -> str:
+    """HH:MM:SS.mmm, the format of the time column."""
+    seconds, ms = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+
+class RoundTimer:
+    def __init__(self):
+        self.round = 0
+        self.started_ns = None
+        self.finished_ns = None
+        self.saved = False
+        self.speed = 1.0
+        # Finished from the local NFC thread as well as the event loop
+        self.lock = threading.Lock()
+
+    def start(self, ts_ns: int | None = None) -> int:
+        with self.lock:
+            self.round += 1
+            self.started_ns = time.monotonic_ns() if ts_ns is None else ts_ns
+            self.finished_ns = None
+            self.saved = False
+            return self.round
+
+    def finish(self, ts_ns: int | None = None) -> int | None:
+        """Stop the clock; returns the duration in ms, None if no round was running."""
+        with self.lock:
+            if self.started_ns is None or self.finished_ns is not None:
+                return None
+            self.finished_ns = max(self.started_ns, time.monotonic_ns() if ts_ns is None else ts_ns)
+            return self._ms(self.finished_ns - self.started_ns)
+
+    def _ms(self, elapsed_ns: int) -> int:
+        return int(elapsed_ns * self.speed) // 1_000_000
+
+    def duration_ms(self) -> int | None:
+        if self.started_ns is None or self.finished_ns is None:
+            return None
+        return self._ms(self.finished_ns - self.started_ns)
+
+    def claim(self) -> int | None:
+        """Duration of the finished round for saving it once; None if there is nothing to save."""
+        with self.lock:
+            duration = self.duration_ms()
+            if duration is None or self.saved:
+                return None
+            self.saved = True
+            return duration
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {"round": self.round, "started_ns": self.started_ns,
+                    "finished_ns": self.finished_ns, "saved": self.saved}
+
+    def restore(self, data: dict, same_boot: bool) -> None:
+        """Continue from to_dict() after a restart.
+
+        The monotonic timestamps are only kept if the machine has not rebooted
+        since; otherwise just the round counter carries over.
+        """
+        with self.lock:
+            self.round = data.get("round", 0)
+            if same_boot:
+                self.started_ns = data.get("started_ns")
+                self.finished_ns = data.get("finished_ns")
+                self.saved = data.get("saved", False)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            running = self.started_ns is not None and self.finished_ns is None
+            duration = self.duration_ms()
+            return {
+                "round": self.round,
+                "running": running,
+                "elapsed_ms": self._ms(time.monotonic_ns() - self.started_ns) if running else duration,
+                "duration_ms": duration,
+                "time": format_duration(duration) if duration is not None else None,
+                "saved": self.saved,
+            }
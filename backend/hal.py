@@ -0,0 +1,189 @@
+"""
+Hardware abstraction layer: card reader, buzzer input and RGB LED backends.
+
+The backend is chosen with MESSE_HARDWARE:
+    real  - MFRC522 over SPI, RPi.GPIO and gpiozero (default)
+    sim   - in-memory simulations, no Raspberry Pi libraries needed
+
+Real backends import their libraries only when constructed, so every module
+stays importable on a laptop.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+HARDWARE_BACKEND = os.environ.get("MESSE_HARDWARE", "real")
+
+# Optional JSON script for the simulated reader: [[delay_s, uid_or_null], ...]
+SIM_SCRIPT = os.environ.get("MESSE_SIM_SCRIPT")
+
+
+# ----------------------
+# Card reader
+# ----------------------
+class MFRC522Reader:
+    """joyit MFRC522 over SPI."""
+
+    def __init__(self):
+        from joyit_mfrc522 import SimpleMFRC522
+        self.reader = SimpleMFRC522()
+
+    def read_uid_no_block(self):
+        """Return the card UID or None, without blocking.
+
+        Only runs REQA + anticollision; skips the authentication and
+        sector read that SimpleMFRC522.read() does for the text we never use.
+        """
+        mfrc = getattr(self.reader, "READER", None)
+        if mfrc is None:
+            return self.reader.read_id_no_block()
+
+        status, _ = mfrc.MFRC522_Request(mfrc.PICC_REQIDL)
+        if status != mfrc.MI_OK:
+            return None
+        status, uid = mfrc.MFRC522_Anticoll()
+        if status != mfrc.MI_OK:
+            return None
+        return self.reader.uid_to_num(uid)
+
+    def cleanup(self):
+        self.reader.cleanup()
+
+
+class SimulatedReader:
+    """Card reader driven from code or a script instead of a real card."""
+
+    def __init__(self, script=None):
+        self.uid = None
+        self.lock = threading.Lock()
+        if script:
+            self.play(script)
+
+    def present(self, uid) -> None:
+        with self.lock:
+            self.uid = int(uid)
+
+    def remove(self) -> None:
+        with self.lock:
+            self.uid = None
+
+    def play(self, script) -> threading.Thread:
+        """Replay [(delay_s, uid_or_None), ...] in a background thread."""
+        def run():
+            for delay, uid in script:
+                time.sleep(delay)
+                if uid is None:
+                    self.remove()
+                else:
+                    self.present(uid)
+
+        thread = threading.Thread(target=run, name="sim_reader_script", daemon=True)
+        thread.start()
+        return thread
+
+    def read_uid_no_block(self):
+        with self.lock:
+            return self.uid
+
+    def cleanup(self):
+        pass
+
+
+# ----------------------
+# Buzzer input
+# ----------------------
+class GPIOBuzzer:
+    """Push button on a GPIO pin with pull-down (1 = pressed)."""
+
+    def __init__(self, pin: int):
+        import RPi.GPIO as GPIO
+        self.GPIO = GPIO
+        self.pin = pin
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
+
+    def read(self) -> int:
+        return self.GPIO.input(self.pin)
+
+    def cleanup(self):
+        self.GPIO.cleanup()
+
+
+class VirtualBuzzer:
+    def __init__(self, pin: int):
+        self.pin = pin
+        self.state = 0
+
+    def press(self) -> None:
+        self.state = 1
+
+    def release(self) -> None:
+        self.state = 0
+
+    def read(self) -> int:
+        return self.state
+
+    def cleanup(self):
+        pass
+
+
+# ----------------------
+# RGB LED
+# ----------------------
+class RecordingLED:
+    """Stand-in for gpiozero.RGBLED that keeps a history of colours."""
+
+    def __init__(self, red=None, green=None, blue=None, active_high=True, max_history=1000):
+        self._color = (0, 0, 0)
+        self.history = []  # (monotonic, color)
+        self.max_history = max_history
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        self._color = tuple(value)
+        self.history.append((time.monotonic(), self._color))
+        if len(self.history) > self.max_history:
+            del self.history[:len(self.history) - self.max_history]
+
+    def off(self):
+        self.color = (0, 0, 0)
+
+    def close(self):
+        pass
+
+
+# ----------------------
+# Factories
+# ----------------------
+def create_reader():
+    if HARDWARE_BACKEND == "sim":
+        script = None
+        if SIM_SCRIPT:
+            with open(SIM_SCRIPT) as f:
+                script = json.load(f)
+        logger.info("Using simulated card reader")
+        return SimulatedReader(script)
+    return MFRC522Reader()
+
+
+def create_buzzer(pin: int):
+    if HARDWARE_BACKEND == "sim":
+        logger.info("Using virtual buzzer")
+        return VirtualBuzzer(pin)
+    return GPIOBuzzer(pin)
+
+
+def create_rgb_led(pins: dict):
+    if HARDWARE_BACKEND == "sim":
+        logger.info("Using recording LED")
+        return RecordingLED(red=pins["red"], green=pins["green"], blue=pins["blue"])
+    from gpiozero import RGBLED
+    return RGBLED(red=pins["red"], green=pins["green"], blue=pins["blue"], active_high=True)
@@ -0,0 +1,226 @@
+"""
+Optional hardware process: runs NFC reading, buzzer polling and LED output
+outside the API process and talks to it through shared-memory rings.
+
+Enable with MESSE_HW_PROCESS=1.
+
+Game state (statuses, round, admission, analytics) still lives in the API
+process as module globals, so the hub has to run as a single uvicorn
+worker. This process only takes the GPIO polling and LED rendering off
+the API process's GIL; several workers would need that state moved out
+of the API process first.
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from ipc import (ShmRing, EV_NFC, EV_BUZZER, EV_NFC_REMOVED, CMD_COLOR, CMD_OFF, CMD_IDLE_START,
+                 CMD_IDLE_STOP, CMD_IDLE_DATA, CMD_IDLE_BEGIN, CMD_NFC_CLEAR, COLOR, LENGTH, TIMESTAMP,
+                 chunks)
+
+logger = logging.getLogger(__name__)
+
+HW_PROCESS_ENABLED = os.environ.get("MESSE_HW_PROCESS", "0") == "1"
+
+COMMAND_POLL_INTERVAL = 0.005  # hardware loop tick
+EVENT_POLL_INTERVAL = 0.01     # API side drain interval
+
+
+# ----------------------
+# API side
+# ----------------------
+class LEDProxy:
+    """Drop-in stand-in for LEDController that forwards calls to the hardware process."""
+
+    def __init__(self, commands: ShmRing):
+        self.commands = commands
+        # The ring has a single producer; LED calls come from the event loop and the NFC thread
+        self.lock = threading.Lock()
+
+    def send(self, *messages: tuple) -> bool:
+        """Push (kind, payload) messages, all or none; False if the ring has no room for them."""
+        with self.lock:
+            if self.commands.free() < len(messages):
+                self.commands.dropped += 1
+                logger.error(f"Hardware command ring full, dropped {len(messages)} command(s)")
+                return False
+            for message in messages:
+                self.commands.push(*message)
+            return True
+
+    def set_color(self, color: tuple[float, float, float]) -> None:
+        self.send((CMD_COLOR, COLOR.pack(*color)))
+
+    def turn_off(self) -> None:
+        self.send((CMD_OFF,))
+
+    def start_idle_mode(self, start_timestamp, timeline: dict | None = None) -> None:
+        messages = []
+        if timeline is not None:
+            # Framed with its length: the hardware side only uses a timeline it got completely
+            data = json.dumps(timeline, separators=(",", ":")).encode()
+            messages.append((CMD_IDLE_BEGIN, LENGTH.pack(len(data))))
+            messages += [(CMD_IDLE_DATA, chunk) for chunk in chunks(data)]
+        messages.append((CMD_IDLE_START, TIMESTAMP.pack(start_timestamp)))
+        if len(messages) > self.commands.slots:
+            logger.error(f"Idle timeline too large for the command ring ({len(messages)} slots)")
+            return
+        self.send(*messages)
+
+    def stop_idle_mode(self) -> None:
+        self.send((CMD_IDLE_STOP,))
+
+    def cleanup(self) -> None:
+        pass
+
+
+class HardwareProcess:
+    """Owns the hardware child process and both rings."""
+
+    def __init__(self, buzzer_pin: int | None = None, station: str | None = None):
+        self.buzzer_pin = buzzer_pin
+        self.station = station
+        self.events = ShmRing()
+        self.commands = ShmRing()
+        self.led = LEDProxy(self.commands)
+        self.process = None
+
+    def start(self) -> None:
+        # fork: the rings are inherited as-is and nothing is pickled
+        ctx = multiprocessing.get_context("fork")
+        self.process = ctx.Process(
+            target=_hardware_main,
+            args=(self.events, self.commands, self.buzzer_pin, self.station),
+            name="hardware",
+            daemon=True,
+        )
+        self.process.start()
+        logger.info(f"Hardware process started (pid {self.process.pid})")
+
+    def clear_nfc(self) -> None:
+        """Reset the reader state in the hardware process, like nfc_state.clear() here.
+
+        Only presence changes cross the ring, so without this a card left on
+        the reader across a round would never be reported again.
+        """
+        self.led.send((CMD_NFC_CLEAR,))
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    async def pump(self, on_nfc, on_nfc_removed, on_buzzer) -> None:
+        """Drain hardware events on the event loop and dispatch them.
+
+        on_nfc(uid, ts) and on_nfc_removed(uid, ts) are called synchronously,
+        on_buzzer(pressed, ts) is awaited.
+        """
+        while True:
+            for kind, ts, payload in self.events.drain():
+                if kind == EV_NFC:
+                    on_nfc(payload.decode(), ts)
+                elif kind == EV_NFC_REMOVED:
+                    on_nfc_removed(payload.decode(), ts)
+                elif kind == EV_BUZZER:
+                    await on_buzzer(payload == b"\x01", ts)
+
+            if self.process is not None and not self.process.is_alive():
+                logger.error("Hardware process died, restarting")
+                self.start()
+
+            await asyncio.sleep(EVENT_POLL_INTERVAL)
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=2)
+        self.events.close()
+        self.commands.close()
+
+
+# ----------------------
+# Hardware side
+# ----------------------
+def _hardware_main(events: ShmRing, commands: ShmRing, buzzer_pin: int | None,
+                   station: str | None) -> None:
+    # The parent's log writer thread does not exist after fork
+    from jsonlog import setup_logging
+    setup_logging(force=True)
+
+    # Imported here so the API process never touches the pins
+    from hal import create_buzzer
+    from led_controller import LEDController
+    from nfc_reader import NFCState, CARD_PRESENT, read_nfc
+
+    # read_nfc and the buzzer loop both produce events
+    push_lock = threading.Lock()
+
+    def push_event(kind: int, payload: bytes = b"", ts: float | None = None) -> None:
+        with push_lock:
+            if not events.push(kind, payload, ts):
+                logger.warning(f"Event ring full, dropped event {kind}")
+
+    # Only presence transitions cross the process boundary, not every poll
+    def forward_card(event, nfc_id, ts):
+        push_event(EV_NFC if event == CARD_PRESENT else EV_NFC_REMOVED, nfc_id.encode(), ts)
+
+    state = NFCState()
+    state.subscribe(forward_card)
+
+    led = LEDController(station)
+    threading.Thread(target=read_nfc, args=(state,), name="read_nfc", daemon=True).start()
+
+    buzzer = None
+    last_state = None
+    if buzzer_pin is not None:
+        buzzer = create_buzzer(buzzer_pin)
+        last_state = buzzer.read()
+
+    timeline = bytearray()
+    timeline_length = None  # announced by CMD_IDLE_BEGIN
+
+    logger.info("Hardware loop running")
+    try:
+        while True:
+            for kind, _, payload in commands.drain():
+                if kind == CMD_COLOR:
+                    led.set_color(COLOR.unpack(payload))
+                elif kind == CMD_OFF:
+                    led.turn_off()
+                elif kind == CMD_IDLE_BEGIN:
+                    timeline.clear()
+                    timeline_length = LENGTH.unpack(payload)[0]
+                elif kind == CMD_IDLE_DATA:
+                    timeline += payload
+                elif kind == CMD_IDLE_START:
+                    if timeline_length is not None and len(timeline) != timeline_length:
+                        logger.error(f"Incomplete idle timeline ({len(timeline)} of {timeline_length} bytes), ignored")
+                    else:
+                        try:
+                            led.start_idle_mode(TIMESTAMP.unpack(payload)[0],
+                                                json.loads(timeline) if timeline_length is not None else None)
+                        except ValueError as e:
+                            logger.error(f"Invalid idle timeline: {e}")
+                    timeline.clear()
+                    timeline_length = None
+                elif kind == CMD_IDLE_STOP:
+                    led.stop_idle_mode()
+                elif kind == CMD_NFC_CLEAR:
+                    state.clear()
+
+            if buzzer is not None:
+                current_state = buzzer.read()
+                if current_state != last_state:
+                    push_event(EV_BUZZER, b"\x01" if current_state == 1 else b"\x00")
+                    last_state = current_state
+
+            time.sleep(COMMAND_POLL_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        led.cleanup()
+        if buzzer is not None:
+            buzzer.cleanup()
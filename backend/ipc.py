@@ -0,0 +1,117 @@
+"""
+Shared-memory ring buffers used between the API process and the hardware process.
+"""
+import struct
+import time
+from multiprocessing import shared_memory
+
+# ----------------------
+# Layout
+# ----------------------
+# Header: head (total slots written) and tail (total slots read).
+# Only the producer writes head and only the consumer writes tail,
+# so a single producer / single consumer pair needs no lock.
+_HEAD = struct.Struct("Q")
+_TAIL = struct.Struct("Q")
+HEADER_SIZE = _HEAD.size + _TAIL.size
+
+# Slot: kind, monotonic timestamp, payload length, payload
+PAYLOAD_SIZE = 32
+SLOT = struct.Struct(f"BdB{PAYLOAD_SIZE}s")
+
+# Message kinds (hardware -> API)
+EV_NFC = 1
+EV_BUZZER = 2
+EV_NFC_REMOVED = 3
+
+# Message kinds (API -> hardware)
+CMD_COLOR = 10
+CMD_OFF = 11
+CMD_IDLE_START = 12
+CMD_IDLE_STOP = 13
+CMD_IDLE_DATA = 14  # chunk of an idle timeline (JSON), after CMD_IDLE_BEGIN and before CMD_IDLE_START
+CMD_NFC_CLEAR = 15  # forget the cards on the reader, so one still there is reported again
+CMD_IDLE_BEGIN = 16  # starts an idle timeline transfer; payload: its length in bytes (LENGTH)
+
+COLOR = struct.Struct("ddd")
+TIMESTAMP = struct.Struct("d")
+LENGTH = struct.Struct("I")
+
+
+def chunks(data: bytes) -> list[bytes]:
+    """Split data into slot-sized payloads."""
+    return [data[i:i + PAYLOAD_SIZE] for i in range(0, len(data), PAYLOAD_SIZE)]
+
+
+class ShmRing:
+    """Fixed-size single-producer / single-consumer ring buffer in shared memory."""
+
+    def __init__(self, name: str | None = None, slots: int = 256):
+        size = HEADER_SIZE + slots * SLOT.size
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.slots = slots
+        self.dropped = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _head(self) -> int:
+        return _HEAD.unpack_from(self.shm.buf, 0)[0]
+
+    def _tail(self) -> int:
+        return _TAIL.unpack_from(self.shm.buf, _HEAD.size)[0]
+
+    def free(self) -> int:
+        """Slots a push can still fill; only meaningful on the producer side."""
+        return self.slots - (self._head() - self._tail())
+
+    def push(self, kind: int, payload: bytes = b"", ts: float | None = None) -> bool:
+        """Append a message. Returns False (and counts a drop) if the ring is full."""
+        if len(payload) > PAYLOAD_SIZE:
+            raise ValueError(f"payload larger than {PAYLOAD_SIZE} bytes")
+        head = self._head()
+        if head - self._tail() >= self.slots:
+            self.dropped += 1
+            return False
+        offset = HEADER_SIZE + (head % self.slots) * SLOT.size
+        SLOT.pack_into(self.shm.buf, offset, kind,
+                       time.monotonic() if ts is None else ts,
+                       len(payload), payload)
+        # Publish only after the slot is fully written
+        _HEAD.pack_into(self.shm.buf, 0, head + 1)
+        return True
+
+    def pop(self) -> tuple[int, float, bytes] | None:
+        """Take the oldest message as (kind, monotonic timestamp, payload), or None if empty."""
+        tail = self._tail()
+        if tail == self._head():
+            return None
+        offset = HEADER_SIZE + (tail % self.slots) * SLOT.size
+        kind, ts, length, payload = SLOT.unpack_from(self.shm.buf, offset)
+        _TAIL.pack_into(self.shm.buf, _HEAD.size, tail + 1)
+        return kind, ts, payload[:length]
+
+    def drain(self, limit: int | None = None) -> list[tuple[int, float, bytes]]:
+        """Pop up to `limit` messages (all pending if None)."""
+        messages = []
+        while limit is None or len(messages) < limit:
+            message = self.pop()
+            if message is None:
+                break
+            messages.append(message)
+        return messages
+
+    def close(self) -> None:
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
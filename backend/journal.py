@@ -0,0 +1,116 @@
+"""
+Append-only game event journal.
+
+Every status change, buzzer edge, satellite command and LED ack is recorded
+as one compact JSON line with the hub's monotonic timestamp (ns) and the
+round it belongs to:
+
+    {"t": 81234567890123, "r": 12, "k": "status", "station": "stl2", "status": "correct", "id": "5841"}
+
+record() only appends to a bounded queue; a background thread writes the
+lines in batches, so the game path never waits on the SD card. replay.py
+feeds a journal back through the hub.
+
+MESSE_JOURNAL  journal file (default backend/journal.jsonl, empty to disable)
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from snapshot import boot_id
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = os.environ.get("MESSE_JOURNAL", os.path.join(os.path.dirname(__file__), "journal.jsonl"))
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 0.5  # seconds
+
+# Event kinds
+OPEN = "open"          # journal opened by a hub process: wall time and boot of its monotonic clock
+BUZZER = "buzzer"      # pressed
+STATUS = "status"      # station, status, id
+LED = "led"            # station, color: LED command issued
+LED_ACK = "led_ack"    # station, color, result, rtt_ms
+COMMAND = "command"    # station, endpoint, result: other hub -> satellite calls
+ROUND_END = "round_end"  # duration_ms
+RESTORE = "restore"    # hub restarted from a state snapshot
+
+
+class Journal:
+    def __init__(self, path: str | None):
+        self.path = path or None
+        self.round = 0
+        self.dropped = 0
+        self.written = 0
+        self.records = queue.Queue(QUEUE_SIZE)
+        self.thread = None
+        if self.path:
+            self.thread = threading.Thread(target=self._write_loop, name="journal", daemon=True)
+            self.thread.start()
+            # t starts over after a reboot; replay.py resets its time base here
+            self.record(OPEN, wall=time.time(), boot=boot_id())
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def record(self, kind: str, ts_ns: int | None = None, **fields) -> None:
+        """Queue one event; never blocks (drops and counts when the queue is full)."""
+        if self.path is None:
+            return
+        entry = {"t": time.monotonic_ns() if ts_ns is None else ts_ns, "r": self.round, "k": kind}
+        entry.update(fields)
+        try:
+            self.records.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Flush what is queued and stop the writer."""
+        if self.thread is not None:
+            self.records.put(None)
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def _write_loop(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                batch = [self.records.get()]
+                deadline = time.monotonic() + FLUSH_INTERVAL
+                # Collect a batch: up to BATCH_SIZE events or FLUSH_INTERVAL after the first
+                while len(batch) < BATCH_SIZE and batch[-1] is not None:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(self.records.get(timeout=timeout))
+                    except queue.Empty:
+                        break
+                stop = batch[-1] is None
+                lines = [json.dumps(entry, separators=(",", ":")) for entry in batch if entry is not None]
+                try:
+                    f.write("\n".join(lines) + "\n" if lines else "")
+                    f.flush()
+                    self.written += len(lines)
+                except OSError as e:
+                    logger.error(f"Journal write failed: {e}")
+                if stop:
+                    return
+
+
+def read(path: str):
+    """Yield the events of a journal file; skips a torn last line."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+journal = Journal(JOURNAL_PATH)
@@ -0,0 +1,163 @@
+"""
+Non-blocking structured logging.
+
+Log calls only format a dict and put it on a bounded queue; a background
+thread writes JSON lines to stdout or a rotating file. A full queue drops the
+record instead of blocking, and repeated messages are rate-limited, so
+logging never adds latency to a tap.
+
+    log = get_logger("hub")
+    log.info("Status updated", satellite="stl1", status="correct")
+
+MESSE_LOG_FILE  write to this rotating file instead of stdout
+MESSE_LOG_LEVEL initial level (default INFO), changeable via /api/log-level
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+QUEUE_SIZE = 10000
+RATE_WINDOW = 1.0      # seconds
+RATE_BURST = 5         # identical messages allowed per window
+MAX_BYTES = 1_000_000  # per file before rotating
+BACKUP_COUNT = 3
+
+_RESERVED = ("exc_info", "stack_info", "stacklevel", "extra")
+
+_listener = None
+dropped = 0
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Let RATE_BURST identical messages through per RATE_WINDOW, count the rest."""
+
+    def __init__(self):
+        super().__init__()
+        self.windows = {}  # (logger, level, msg) -> [window start, passed, suppressed]
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= RATE_WINDOW:
+                suppressed = window[2] if window else 0
+                self.windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.fields = {**getattr(record, "fields", {}), "suppressed": suppressed}
+                if len(self.windows) > 1000:
+                    self.windows.clear()
+                return True
+            if window[1] < RATE_BURST:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the writer thread; only freeze the arguments here
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class FieldAdapter(logging.LoggerAdapter):
+    """Turns keyword arguments into structured fields."""
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in _RESERVED}
+        kwargs["extra"] = {"fields": fields}
+        return msg, kwargs
+
+
+def setup_logging(force: bool = False) -> None:
+    """Route the root logger through the queue; safe to call more than once.
+
+    force=True rebuilds it, e.g. in a forked child where the writer thread does not exist.
+    """
+    global _listener
+    if _listener is not None and not force:
+        return
+
+    log_file = os.environ.get("MESSE_LOG_FILE")
+    if log_file:
+        writer = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT)
+    else:
+        writer = logging.StreamHandler(sys.stdout)
+    writer.setFormatter(JSONFormatter())
+
+    records = queue.Queue(QUEUE_SIZE)
+    handler = DroppingQueueHandler(records)
+    handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(os.environ.get("MESSE_LOG_LEVEL", "INFO").upper())
+
+    _listener = logging.handlers.QueueListener(records, writer, respect_handler_level=True)
+    _listener.start()
+
+
+def get_logger(name: str) -> FieldAdapter:
+    return FieldAdapter(logging.getLogger(name), {})
+
+
+def set_level(level: str, name: str | None = None) -> None:
+    """Change a logger's level at runtime (root logger if name is None)."""
+    level = level.upper()
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError(f"unknown level '{level}'")
+    logging.getLogger(name).setLevel(level)
+
+
+# ----------------------
+# FastAPI wiring
+# ----------------------
+class LogLevel(BaseModel):
+    level: str
+    logger: str | None = None
+
+
+def add_routes(app) -> None:
+    """Add POST /api/log-level to app."""
+
+    @app.post("/api/log-level")
+    async def change_log_level(change: LogLevel):
+        try:
+            set_level(change.level, change.logger)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"logger": change.logger or "root", "level": change.level.upper(), "dropped": dropped}
@@ -0,0 +1,109 @@
+"""
+Delta sync for the leaderboard screens.
+
+Every insert, update and delete on the score tables is appended to
+score_changes by triggers (db.py), so the log's version is a change counter
+for both tables. A screen loads the board once and then only asks for what
+changed:
+
+    GET /api/leaderboard/all_scores/changes                -> full board
+    GET /api/leaderboard/all_scores/changes?since=1234     -> delta
+
+A delta lists the changed rows with their current rank (upserts), the ids
+of removed rows (deletes) and the rank ranges whose entries moved. A full
+board comes back instead when the client is older than the kept log, from
+another database, or when more than MAX_DELTA rows changed.
+
+Boards are ordered by time, then id; rank 1 is the fastest.
+"""
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from db import SCORE_TABLES, db
+
+MAX_DELTA = 200
+
+
+def current_version(conn) -> int:
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'score_changes'").fetchone()
+    return row[0] if row else 0
+
+
+def rank(conn, table: str, time_text: str, row_id: int) -> int:
+    """1-based position a row with this time and id has (or would have) on the board."""
+    return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE (time, id) < (?, ?)",
+                        (time_text, row_id)).fetchone()[0] + 1
+
+
+def full_board(conn, table: str, version: int) -> dict:
+    rows = conn.execute(f"SELECT id, name, time, created_at FROM {table} ORDER BY time, id").fetchall()
+    return {"version": version, "full": True,
+            "rows": [{**dict(row), "rank": index + 1} for index, row in enumerate(rows)]}
+
+
+def merge_ranges(ranges: list[list[int]]) -> list[list[int]]:
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def changes(table: str, since: int | None = None) -> dict:
+    if table not in SCORE_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table {table}")
+
+    with db.get_connection() as conn:
+        # One read transaction, so the rows match the version
+        conn.execute("BEGIN")
+        version = current_version(conn)
+        if since is None or since > version:
+            return full_board(conn, table, version)
+        if since == version:
+            return {"version": version, "full": False, "upserts": [], "deletes": [], "ranks": []}
+
+        oldest = conn.execute("SELECT MIN(version) FROM score_changes").fetchone()[0]
+        if oldest is None or oldest > since + 1:
+            return full_board(conn, table, version)  # the log no longer reaches back to since
+
+        logged = conn.execute(
+            "SELECT row_id, old_time, new_time FROM score_changes WHERE version > ? AND tbl = ? ORDER BY version",
+            (since, table)).fetchall()
+        row_ids = {entry["row_id"] for entry in logged}
+        if len(row_ids) > MAX_DELTA:
+            return full_board(conn, table, version)
+
+        current = {}
+        for row_id in row_ids:
+            row = conn.execute(f"SELECT id, name, time, created_at FROM {table} WHERE id = ?",
+                               (row_id,)).fetchone()
+            if row is not None:
+                current[row_id] = dict(row)
+        size = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+        upserts = [{**row, "rank": rank(conn, table, row["time"], row["id"])} for row in current.values()]
+        # Rows between where a change took a row from and where it put it have moved
+        ranges = []
+        for entry in logged:
+            ends = [rank(conn, table, t, entry["row_id"]) for t in (entry["old_time"], entry["new_time"]) if t]
+            if entry["old_time"] is None or entry["new_time"] is None:
+                ends.append(max(size, ends[0]))  # an insert or delete shifts the rest of the board
+            ranges.append([min(ends), max(ends)])
+
+    return {
+        "version": version,
+        "full": False,
+        "upserts": sorted(upserts, key=lambda row: row["rank"]),
+        "deletes": sorted(row_ids - current.keys()),
+        "ranks": merge_ranges(ranges),
+    }
+
+
+def add_routes(app) -> None:
+    """Add the /api/leaderboard/{table}/changes endpoint to app."""
+
+    @app.get("/api/leaderboard/{table}/changes")
+    async def leaderboard_changes(table: str, since: int | None = None):
+        return await run_in_threadpool(changes, table, since)
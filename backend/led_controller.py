@@ -1,19 +1,13 @@
-import math
 import threading
 
-from gpiozero import RGBLED
 import logging
 import time
 
+from animation import Timeline, classic_timeline
+from hal import create_rgb_led
 from sat_config import SATELLITE_ID
 
-# ----------------------
-# Logging setup
-# ----------------------
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Handlers are set up by the importing app (jsonlog.setup_logging)
 logger = logging.getLogger(__name__)
 
 # ----------------------
@@ -22,108 +16,149 @@ logger = logging.getLogger(__name__)
 # Assign GPIO pins for single RGB LED per satellite
 LED_PINS = {"red": 19, "green": 13, "blue": 26}
 
+# Colours are rounded to 8-bit PWM steps so tiny changes do not cause writes
+PWM_STEPS = 255
+
+OFF = (0.0, 0.0, 0.0)
+
+
+def _quantize(color) -> tuple[float, float, float]:
+    return tuple(round(max(0.0, min(1.0, c)) * PWM_STEPS) / PWM_STEPS for c in color)
+
+
 class LEDController:
-    def __init__(self):
-        self.idle_active = None
-        try:
-            self.led = RGBLED(
-                red=LED_PINS["red"],
-                green=LED_PINS["green"],
-                blue=LED_PINS["blue"],
-                active_high=True
-            )
-            self.led.off()
-            logger.info("LED initialized")
-        except Exception as e:
-            logger.error(f"Failed to initialize LED: {e}")
-            self.led = None
+    """Owns the RGB LED through a single render thread.
+
+    Output is composed from layers, highest priority first:
+    blink > solid colour > idle animation > off.
+    The thread only wakes for animation frames (on a fixed time grid) or when a
+    layer changes, and only writes the LED when the colour actually changes.
+    """
+
+    def __init__(self, station: str | None = None, lazy: bool = False):
+        """lazy=True leaves the GPIO pins alone until open(); colours set before are shown then."""
+        # Name this LED has in idle timelines ("local" on the hub)
+        self.station = station or SATELLITE_ID
+        self.idle = None   # (start timestamp, Timeline)
+        self.solid = None  # colour
+        self.blink = None  # (colour, half period, monotonic start, monotonic end)
+        self.written = None
+        self.running = True
+        self.wake = threading.Condition()
+        self.led = None
+        self.thread = None
+        if not lazy:
+            try:
+                self.open()
+            except Exception as e:
+                logger.error(f"Failed to initialize LED: {e}")
+
+    def open(self) -> None:
+        """Claim the pins and start rendering; raises if the LED cannot be set up."""
+        if self.led is not None:
+            return
+        led = create_rgb_led(LED_PINS)
+        led.off()
+        self.written = OFF
+        self.led = led
+        logger.info("LED initialized")
+        self.thread = threading.Thread(target=self._render_loop, name="led_render", daemon=True)
+        self.thread.start()
+
+    def _update(self, **layers) -> None:
+        with self.wake:
+            for name, value in layers.items():
+                setattr(self, name, value)
+            self.wake.notify()
 
     def set_color(self, color: tuple[float, float, float]) -> None:
         """Set LED color (RGB values between 0-1)."""
-        if not self.led:
-            logger.error("LED not initialized")
-            return
-        try:
-            self.led.color = color
-        except Exception as e:
-            logger.error(f"Error setting LED color: {e}")
+        self._update(solid=tuple(color), blink=None)
 
     def blink_color(self, color: tuple[float, float, float], duration: float = 0.5, times: int = 3) -> None:
-        """Blink LED a few times with given color."""
-        if not self.led:
-            return
-        for _ in range(times):
-            self.set_color(color)
-            time.sleep(duration)
-            self.led.off()
-            time.sleep(duration)
+        """Blink LED a few times with given color; returns immediately."""
+        if not duration > 0:
+            raise ValueError("blink duration must be positive")
+        now = time.monotonic()
+        self._update(blink=(tuple(color), duration, now, now + 2 * duration * times))
 
     def turn_off(self) -> None:
-        """Turn off LED."""
-        if self.led:
-            self.led.off()
+        """Turn off LED (a running idle animation keeps playing)."""
+        self._update(solid=None, blink=None)
 
     def cleanup(self) -> None:
         """Cleanup GPIO on exit."""
         if self.led:
+            self._update(running=False)
+            self.thread.join(timeout=1)
             self.led.close()
             logger.info("LED cleaned up")
 
-    def start_idle_mode(self, start_timestamp):
-        self.idle_active = True
-        threading.Thread(target=self._idle_loop, args=(start_timestamp,), daemon=True).start()
+    def start_idle_mode(self, start_timestamp, timeline: dict | None = None):
+        """Render an animation timeline (see animation.py) from the shared start timestamp.
 
-    def stop_idle_mode(self):
-        self.idle_active = False
-        self.turn_off()
-
-    def _idle_loop(self, start_ts):
-        # Idle mode constants
-        SWING = 30
-        OFF1 = 5
-        RUNNER = 60
-        OFF2 = 5
-
-        CYCLE = SWING + OFF1 + RUNNER + OFF2   # = 100 seconds
-
-        while self.idle_active:
-            now = time.time()
-            t = (now - start_ts) % CYCLE
-
-            # 1: SWING (0–30)
-            if t < SWING:
-                level = (1 + math.sin(now * 4)) / 2  # smooth breathing
-                self.set_color((0, 0, level))
-
-            # 2: OFF (30–35)
-            elif t < SWING + OFF1:
-                self.turn_off()
+        Without a timeline the classic idle show is played. Starting again
+        replaces the running animation.
+        """
+        compiled = Timeline(timeline or classic_timeline(), self.station)
+        self._update(idle=(start_timestamp, compiled))
 
-            # 3: RUNNER (35–95)
-            elif t < SWING + OFF1 + RUNNER:
-                phase = int((t - (SWING + OFF1)) % 10)  # 0–9
-
-                if phase < 5:
-                    active_index = phase
-                else:
-                    active_index = 9 - phase
-
-                if active_index == int(SATELLITE_ID[-1]):
-                    self.set_color((0, 0, 1))  # BLUE
-                else:
-                    self.turn_off()
-
-            # 4: OFF (95–100)
-            else:
-                self.turn_off()
-
-            time.sleep(0.05)  # 20 FPS
+    def stop_idle_mode(self):
+        self._update(idle=None, solid=None, blink=None)
+
+    # ----------------------
+    # Render thread
+    # ----------------------
+    def _frame(self, now: float) -> tuple[tuple, float | None]:
+        """Colour to show now and the monotonic time of the next frame (None: wait for a change)."""
+        blink = self.blink
+        if blink is not None:
+            color, half, started, ends = blink
+            if now < ends:
+                toggles = int((now - started) / half)
+                on = toggles % 2 == 0
+                return (color if on else OFF), min(started + (toggles + 1) * half, ends)
+            self.blink = None
+        if self.solid is not None:
+            return self.solid, None
+        if self.idle is not None:
+            start_ts, timeline = self.idle
+            elapsed = time.time() - start_ts
+            # Frames sit on a grid anchored at the shared start, so they never drift
+            frame = int(elapsed * timeline.fps) + 1
+            return timeline.color_at(elapsed), now + frame / timeline.fps - elapsed
+        return OFF, None
+
+    def _render_loop(self) -> None:
+        with self.wake:
+            while self.running:
+                now = time.monotonic()
+                try:
+                    color, next_frame = self._frame(now)
+                except Exception as e:
+                    # Drop the animation layers rather than the only thread driving the LED
+                    logger.error(f"Error rendering LED frame: {e}")
+                    self.blink = None
+                    self.idle = None
+                    continue
+                color = _quantize(color)
+                if color != self.written:
+                    try:
+                        self.led.color = color
+                        self.written = color
+                    except Exception as e:
+                        logger.error(f"Error setting LED color: {e}")
+
+                # Sleeps until the next frame or until a layer changes
+                self.wake.wait(None if next_frame is None else max(0.0, next_frame - now))
 
 
 # ----------------------
 # Test function
 # ----------------------
 if __name__ == "__main__":
+    from jsonlog import setup_logging
+    setup_logging()
     controller = LEDController()
     try:
         controller.turn_off()
@@ -137,6 +172,7 @@ if __name__ == "__main__":
 
         logger.info("Blink BLUE")
         controller.blink_color((0, 0, 1))
+        time.sleep(3)
 
     finally:
         controller.cleanup()
@@ -0,0 +1,195 @@
+"""
+Minimal in-process metrics with Prometheus text output.
+
+No client library needed; every update is a dict lookup and an addition
+under a lock, cheap enough for the hot paths on the Pi.
+"""
+import asyncio
+import threading
+import time
+
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+
+# Seconds; covers sub-millisecond SQLite reads up to satellite timeouts
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_lock = threading.Lock()
+_registry = []
+
+
+def _label_text(names, values) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v).replace(chr(34), chr(39))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.values = {}
+        _registry.append(self)
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with _lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_label_text(self.labels, key)} {value}")
+        return lines
+
+
+class Gauge:
+    """Set directly, or computed at scrape time from a callback returning {labels: value}.
+
+    type_name="counter" exports a callback that reads an existing monotonic count.
+    """
+
+    def __init__(self, name: str, help_text: str, labels=(), callback=None, type_name="gauge"):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.values = {}
+        self.callback = callback
+        self.type_name = type_name
+        _registry.append(self)
+
+    def set(self, *label_values, value: float) -> None:
+        with _lock:
+            self.values[label_values] = value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        values = self.callback() if self.callback else self.values
+        for key, value in values.items():
+            if value is not None:
+                lines.append(f"{self.name}{_label_text(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help_text, tuple(labels)
+        self.buckets = buckets
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        _registry.append(self)
+
+    def observe(self, *label_values, value: float) -> None:
+        with _lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        for key, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_label_text(names, key + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {series[-1]}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    with _lock:
+        lines = []
+        for metric in _registry:
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------
+# Shared metrics
+# ----------------------
+http_request_seconds = Histogram(
+    "messe_http_request_seconds", "HTTP request latency per route", ("method", "route", "status"))
+db_query_seconds = Histogram(
+    "messe_db_query_seconds", "SQLite statement duration", ("statement",))
+satellite_calls = Counter(
+    "messe_satellite_calls_total", "Hub to satellite HTTP calls", ("satellite", "endpoint", "result"))
+hub_calls = Counter(
+    "messe_hub_calls_total", "Satellite to hub HTTP calls", ("result",))
+buzzer_events = Counter(
+    "messe_buzzer_events_total", "Buzzer edges", ("edge",))
+loop_lag_seconds = Histogram(
+    "messe_event_loop_lag_seconds", "Event loop scheduling delay",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+loop_lag_last = Gauge(
+    "messe_event_loop_lag_last_seconds", "Most recent event loop scheduling delay")
+
+
+def call_result(error=None) -> str:
+    """Label for an outgoing HTTP call: ok, timeout or error (httpx and requests alike)."""
+    if error is None:
+        return "ok"
+    return "timeout" if "Timeout" in type(error).__name__ else "error"
+
+
+def nfc_gauges(read_timing) -> None:
+    """Export the NFC read loop counters from nfc_reader.read_timing."""
+    def collect(field):
+        return lambda: {(): read_timing.snapshot()[field]}
+
+    Gauge("messe_nfc_polls_total", "NFC reader polls", callback=collect("polls"), type_name="counter")
+    Gauge("messe_nfc_reads_total", "NFC polls that returned a card", callback=collect("reads"),
+          type_name="counter")
+    Gauge("messe_nfc_errors_total", "NFC read errors", callback=collect("errors"), type_name="counter")
+    Gauge("messe_nfc_poll_interval_seconds", "Current NFC poll interval", callback=collect("interval_s"))
+    Gauge("messe_nfc_last_read_milliseconds", "Duration of the last successful NFC poll",
+          callback=collect("last_read_ms"))
+
+
+def clock_gauges(clocks) -> None:
+    """Export the per-satellite clock offsets from a clocksync.ClockSync."""
+    def collect(field):
+        def values():
+            return {(name,): snapshot.get(field) / 1000 if snapshot.get(field) is not None else None
+                    for name, snapshot in clocks.snapshot().items()}
+        return values
+
+    Gauge("messe_clock_offset_seconds", "Satellite minus hub wall clock", ("satellite",),
+          callback=collect("offset_ms"))
+    Gauge("messe_clock_rtt_seconds", "Round-trip time of the best clock probe", ("satellite",),
+          callback=collect("rtt_ms"))
+
+
+# ----------------------
+# FastAPI wiring
+# ----------------------
+def instrument(app) -> None:
+    """Add per-route latency middleware and the /metrics endpoint to app."""
+
+    @app.middleware("http")
+    async def time_request(request: Request, call_next):
+        started = time.perf_counter()
+        response = await call_next(request)
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or "static"
+        http_request_seconds.observe(request.method, path, response.status_code,
+                                     value=time.perf_counter() - started)
+        return response
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+
+async def monitor_loop_lag(interval: float = 0.5) -> None:
+    """Measure how late the event loop wakes us up; run as a task."""
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - expected)
+        loop_lag_seconds.observe(value=lag)
+        loop_lag_last.set(value=lag)
@@ -1,35 +1,130 @@
 import logging
-from joyit_mfrc522 import SimpleMFRC522
 import time
 import threading
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from hal import create_reader
+
+# Handlers are set up by the importing app (jsonlog.setup_logging)
 logger = logging.getLogger(__name__)
 
-# initialize object for rfid module
-reader = SimpleMFRC522()
+# rfid module backend, created on first use
+reader = None
+
+def get_reader():
+    global reader
+    if reader is None:
+        reader = create_reader()
+    return reader
+
+# Empty polls in a row before a present card counts as removed.
+# Absorbs single missed polls (e.g. the card answering only every other REQA).
+MISSED_POLLS_FOR_REMOVAL = 3
+
+CARD_PRESENT = "present"
+CARD_REMOVED = "removed"
 
 class NFCState:
     def __init__(self):
         self.last_read = {
             "id": None,
-            "timestamp": None
+            "timestamp": None,
+            "detected": None  # monotonic time the card was put on the reader
         }
+        # uid -> {"present": bool, "since": monotonic, "missed": int}
+        self.cards = {}
+        self.listeners = []
         self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
         logger.info("NFCState initialized")
 
-    def update(self, nfc_id):
+    def subscribe(self, callback):
+        """Register callback(event, nfc_id, monotonic_ts) for CARD_PRESENT / CARD_REMOVED."""
+        self.listeners.append(callback)
+
+    def _emit(self, events):
+        # Called outside the lock so listeners may read the state
+        for event, nfc_id, ts in events:
+            logger.debug(f"NFC card {event} - ID: {nfc_id}")
+            for callback in self.listeners:
+                callback(event, nfc_id, ts)
+
+    def _set_absent(self, nfc_id, now, events):
+        card = self.cards[nfc_id]
+        card["present"] = False
+        card["since"] = now
+        card["missed"] = 0
+        events.append((CARD_REMOVED, nfc_id, now))
+        if self.last_read["id"] == nfc_id:
+            self.last_read = {"id": None, "timestamp": None, "detected": None}
+
+    def update(self, nfc_id, ts=None):
+        """Record a successful poll of nfc_id (at monotonic ts, default now)."""
+        events = []
         with self.lock:
             nfc_id=str(nfc_id)
+            now = time.monotonic() if ts is None else ts
+
+            # A different card on the reader means the previous one is gone,
+            # no need to wait for missed polls
+            for other_id, card in self.cards.items():
+                if other_id != nfc_id and card["present"]:
+                    self._set_absent(other_id, now, events)
+
+            card = self.cards.setdefault(nfc_id, {"present": False, "since": now, "missed": 0})
+            card["missed"] = 0
+            if not card["present"]:
+                card["present"] = True
+                card["since"] = now
+                events.append((CARD_PRESENT, nfc_id, now))
+
             self.last_read = {
                 "id": nfc_id,
-                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "detected": card["since"]
             }
-            logger.debug(f"Raw NFC card detected - ID: {nfc_id}")
+            if events:
+                self.changed.notify_all()
+        self._emit(events)
+
+    def miss(self):
+        """Record an empty poll; cards missing for enough polls in a row are removed."""
+        events = []
+        with self.lock:
+            now = time.monotonic()
+            for nfc_id, card in self.cards.items():
+                if card["present"]:
+                    card["missed"] += 1
+                    if card["missed"] >= MISSED_POLLS_FOR_REMOVAL:
+                        self._set_absent(nfc_id, now, events)
+            if events:
+                self.changed.notify_all()
+        self._emit(events)
+
+    def remove(self, nfc_id, ts=None):
+        """Mark nfc_id as removed right away (e.g. removal reported by another process)."""
+        events = []
+        with self.lock:
+            nfc_id = str(nfc_id)
+            if self.cards.get(nfc_id, {}).get("present"):
+                self._set_absent(nfc_id, time.monotonic() if ts is None else ts, events)
+                self.changed.notify_all()
+        self._emit(events)
+
+    def clear(self):
+        """Forget the last reading and all presence state."""
+        with self.lock:
+            self.last_read = {"id": None, "timestamp": None, "detected": None}
+            self.cards.clear()
+            self.changed.notify_all()
+
+    def is_present(self, nfc_id):
+        with self.lock:
+            return self.cards.get(str(nfc_id), {}).get("present", False)
+
+    def wait_for_change(self, timeout):
+        """Block until a card appears or is removed, or timeout passes."""
+        with self.changed:
+            self.changed.wait(timeout)
 
     def get_reading(self):
         with self.lock:
@@ -38,25 +133,90 @@ class NFCState:
 
 nfc_state = NFCState()
 
+# ----------------------
+# Polling configuration
+# ----------------------
+POLL_FAST = 0.02       # interval right after card activity
+POLL_IDLE = 0.2        # slowest interval when nothing is happening
+POLL_BACKOFF = 1.5     # growth factor per empty poll once the active window is over
+ACTIVE_WINDOW = 2.0    # seconds to keep polling fast after the last card
+
+
+class ReadTiming:
+    """Per-poll timing of the read loop."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.polls = 0
+        self.reads = 0
+        self.errors = 0
+        self.last_read_ms = None
+        self.total_read_ms = 0.0
+        self.max_read_ms = 0.0
+        self.interval = POLL_IDLE
+
+    def record(self, duration_ms: float, hit: bool):
+        with self.lock:
+            self.polls += 1
+            if hit:
+                self.reads += 1
+                self.last_read_ms = duration_ms
+                self.total_read_ms += duration_ms
+                self.max_read_ms = max(self.max_read_ms, duration_ms)
+
+    def record_error(self):
+        with self.lock:
+            self.errors += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "polls": self.polls,
+                "reads": self.reads,
+                "errors": self.errors,
+                "last_read_ms": self.last_read_ms,
+                "avg_read_ms": self.total_read_ms / self.reads if self.reads else None,
+                "max_read_ms": self.max_read_ms,
+                "interval_s": self.interval,
+            }
+
+read_timing = ReadTiming()
+
+
+def read_uid_no_block():
+    """Return the card UID or None, without blocking."""
+    return get_reader().read_uid_no_block()
+
+
 # Function to continuously read NFC tags
-def read_nfc():
+def read_nfc(state: NFCState = nfc_state):
     logger.info("NFC Reader starting...")
+    interval = POLL_IDLE
+    last_activity = 0.0
     try:
         while True:
             try:
-                logger.debug("Attempting to read card...")
-                # Use regular read() instead of read_id_no_block()
-                # since joyit library might have different methods
-                id, text = reader.read()
+                started = time.perf_counter()
+                id = read_uid_no_block()
+                duration_ms = (time.perf_counter() - started) * 1000
+                read_timing.record(duration_ms, bool(id))
+
+                now = time.monotonic()
                 if id:
-                    logger.info(f"Successfully read card - ID: {id}")
-                    nfc_state.update(id)
-                    time.sleep(0.5)
+                    logger.debug(f"Read card - ID: {id} in {duration_ms:.1f} ms")
+                    state.update(id)
+                    last_activity = now
+                    interval = POLL_FAST
                 else:
-                    logger.debug("No card detected")
-                    time.sleep(0.1)
+                    state.miss()
+                    if now - last_activity > ACTIVE_WINDOW:
+                        # Back off gradually while the reader stays empty
+                        interval = min(interval * POLL_BACKOFF, POLL_IDLE)
+                read_timing.interval = interval
+                time.sleep(interval)
             except Exception as e:
                 logger.error(f"Error reading NFC: {str(e)}")
+                read_timing.record_error()
                 time.sleep(1)  # Wait a bit longer if there's an error
 
     except KeyboardInterrupt:
@@ -65,26 +225,34 @@ def read_nfc():
         logger.error(f"Critical error in read_nfc: {str(e)}")
     finally:
         try:
-            reader.cleanup()  # Use cleanup() if available in joyit library
+            get_reader().cleanup()
             logger.info("NFC Reader cleaned up")
         except:
             pass
 
 # Add a function to check if the reader is working
-def test_reader():
-    logger.info("Testing NFC reader...")
+def test_reader(timeout=10.0):
+    logger.info("Testing NFC reader, hold a card to it...")
     try:
-        id, text = reader.read()
-        logger.info(f"Test read successful - ID: {id}, Text: {text}")
-        return True
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            id = read_uid_no_block()
+            if id:
+                logger.info(f"Test read successful - ID: {id}")
+                return True
+            time.sleep(POLL_FAST)
+        logger.error("Test read failed: no card within timeout")
+        return False
     except Exception as e:
         logger.error(f"Test read failed: {str(e)}")
         return False
 
 # Optional: Add this to your server startup to test the reader
 if __name__ == "__main__":
+    from jsonlog import setup_logging
+    setup_logging()
     if test_reader():
         logger.info("NFC Reader test passed, starting continuous reading...")
         read_nfc()
     else:
-        logger.error("NFC Reader test failed!")
\ No newline at end of file
+        logger.error("NFC Reader test failed!")
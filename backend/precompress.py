@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Write gzip and brotli variants next to the built frontend files.
+
+Runs after `npm run build` (postbuild). static_files.py serves the variants
+by Accept-Encoding. Brotli needs the optional `brotli` package; without it
+only .gz files are written.
+
+    python backend/precompress.py [dist directory]
+"""
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Images and sounds are compressed already
+COMPRESSIBLE = (".html", ".js", ".css", ".svg", ".json", ".map", ".txt", ".ico", ".webmanifest")
+MIN_SIZE = 256      # bytes; smaller files are not worth a second request path
+MAX_RATIO = 0.9     # keep a variant only if it saves at least 10 %
+
+
+def precompress(directory: str) -> dict:
+    stats = {"files": 0, "gzip": 0, "br": 0, "bytes_in": 0, "bytes_gzip": 0, "bytes_br": 0}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < MIN_SIZE:
+                continue
+            stats["files"] += 1
+            stats["bytes_in"] += len(data)
+
+            variants = {"gzip": (".gz", gzip.compress(data, compresslevel=9, mtime=0))}
+            if brotli is not None:
+                variants["br"] = (".br", brotli.compress(data, quality=11))
+            for coding, (suffix, encoded) in variants.items():
+                if len(encoded) > len(data) * MAX_RATIO:
+                    continue
+                with open(path + suffix, "wb") as f:
+                    f.write(encoded)
+                stats[coding] += 1
+                stats[f"bytes_{coding}"] += len(encoded)
+    return stats
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "dist")
+    if brotli is None:
+        print("brotli not installed, writing gzip only (pip install brotli)")
+    print(precompress(target))
@@ -0,0 +1,143 @@
+"""
+Low-overhead sampling profiler that can be switched on at runtime.
+
+A background thread snapshots every thread's stack with sys._current_frames()
+and counts identical stacks. The result is in collapsed-stack format
+("thread;outer;inner count" per line), which flamegraph.pl, speedscope and
+inferno read directly.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from fastapi import HTTPException
+from fastapi.responses import PlainTextResponse
+
+DEFAULT_INTERVAL_MS = 10
+MIN_INTERVAL_MS = 1  # below that the sampler would spin holding the GIL
+MAX_SECONDS = 300
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self.thread = None
+        self.running = False
+        self.stacks = {}
+        self.samples = 0
+        self.started = None
+        self.lock = threading.Lock()
+
+    def start(self, interval_ms: float = DEFAULT_INTERVAL_MS) -> None:
+        if not interval_ms >= MIN_INTERVAL_MS:  # also rejects NaN
+            raise ValueError(f"interval_ms must be at least {MIN_INTERVAL_MS}")
+        with self.lock:
+            if self.running:
+                raise RuntimeError("profiler already running")
+            self.running = True
+            self.stacks = {}
+            self.samples = 0
+            self.started = time.monotonic()
+            self.thread = threading.Thread(
+                target=self._sample_loop, args=(interval_ms / 1000,), name="profiler", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks."""
+        with self.lock:
+            if not self.running:
+                raise RuntimeError("profiler not running")
+            self.running = False
+        self.thread.join()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        lines = [f"{stack} {count}" for stack, count in
+                 sorted(self.stacks.items(), key=lambda item: -item[1])]
+        return "\n".join(lines) + "\n"
+
+    def status(self) -> dict:
+        return {
+            "running": self.running,
+            "samples": self.samples,
+            "seconds": round(time.monotonic() - self.started, 3) if self.started else None,
+        }
+
+    def _sample_loop(self, interval: float) -> None:
+        own_ident = threading.get_ident()
+        next_sample = time.monotonic()
+        while self.running:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+            # Deadline-based so a slow sample does not shift the next ones
+            next_sample += interval
+            delay = next_sample - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_sample = time.monotonic()
+
+
+profiler = SamplingProfiler()
+
+
+# ----------------------
+# FastAPI wiring
+# ----------------------
+def add_routes(app) -> None:
+    """Add the /api/profile endpoints to app."""
+
+    def start(interval_ms: float) -> None:
+        try:
+            profiler.start(interval_ms)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    async def stop() -> str:
+        # Joins the sampler thread, so not on the event loop
+        try:
+            return await asyncio.to_thread(profiler.stop)
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    @app.post("/api/profile/start")
+    async def start_profile(interval_ms: float = DEFAULT_INTERVAL_MS):
+        start(interval_ms)
+        return profiler.status()
+
+    @app.post("/api/profile/stop", response_class=PlainTextResponse)
+    async def stop_profile():
+        return PlainTextResponse(await stop())
+
+    @app.get("/api/profile/status")
+    async def profile_status():
+        return profiler.status()
+
+    @app.get("/api/profile", response_class=PlainTextResponse)
+    async def capture_profile(seconds: float = 10, interval_ms: float = DEFAULT_INTERVAL_MS):
+        """Sample for the given time and return the collapsed stacks."""
+        if not 0 < seconds <= MAX_SECONDS:
+            raise HTTPException(status_code=400, detail=f"seconds must be in (0, {MAX_SECONDS}]")
+        start(interval_ms)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            # Also when the client disconnects, or the sampler would run on for good
+            collapsed = await stop()
+        return PlainTextResponse(collapsed, headers={
+            "Content-Disposition": f'attachment; filename="profile-{int(time.time())}.folded"'})
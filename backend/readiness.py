@@ -0,0 +1,135 @@
+"""
+Startup of the hub's and satellites' subsystems, and GET /ready.
+
+Importing server.py or satellite.py touches no hardware and creates no
+schema; the startup hook hands each subsystem (database, LED, NFC reader,
+buzzer, ...) to Readiness.start(), which sets them up in parallel in worker
+threads and times them. The app serves requests (and the UI) while they
+come up.
+
+A required subsystem that fails keeps /ready at 503, an optional one leaves
+the app degraded, e.g. serving the UI without an NFC reader. Either is
+retried every RETRY_INTERVAL seconds until it comes up.
+
+    GET /ready  ->  200 / 503
+    {"ready": true, "degraded": true, "serving_after_s": 0.84, "ready_after_s": 1.02,
+     "subsystems": {"db": {"state": "up", "required": true, "seconds": 0.012, ...},
+                    "nfc": {"state": "failed", "required": false, "error": "...", "attempts": 3}}}
+
+Times are measured from process start, so they include interpreter startup
+and imports.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+RETRY_INTERVAL = 10.0  # seconds between attempts at a failed subsystem
+
+PENDING = "pending"
+UP = "up"
+FAILED = "failed"
+
+
+def process_age() -> float | None:
+    """Seconds since this process was started, None where /proc is not available."""
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name may contain spaces; the fields after it are fixed
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Readiness:
+    def __init__(self):
+        # Process start on the monotonic clock; import time if unknown
+        self.started = time.monotonic() - (process_age() or 0.0)
+        self.subsystems = {}
+        self.serving_after = None
+        self.ready_after = None
+
+    def _since_start(self) -> float:
+        return round(time.monotonic() - self.started, 3)
+
+    def serving(self) -> None:
+        """Note that the app accepts requests; call at the end of the startup hook."""
+        self.serving_after = self._since_start()
+        logger.info(f"Serving {self.serving_after:.2f}s after process start")
+
+    def start(self, name: str, setup, required: bool = True, on_up=None, retry: bool = True,
+              thread: bool = True) -> asyncio.Task:
+        """Set up a subsystem in the background; call on the event loop.
+
+        It is registered as pending right away, so call this before serving().
+        setup() runs in a worker thread, or on the event loop with thread=False
+        (e.g. to fork from the main thread). on_up(result) is called on the
+        event loop once it succeeded, e.g. to start the subsystem's threads.
+        """
+        self.subsystems[name] = {"state": PENDING, "required": required, "seconds": None,
+                                 "error": None, "attempts": 0}
+        return asyncio.create_task(self._run(name, setup, on_up, retry, thread))
+
+    async def _run(self, name: str, setup, on_up, retry: bool, thread: bool) -> None:
+        entry = self.subsystems[name]
+        while True:
+            entry["attempts"] += 1
+            started = time.monotonic()
+            try:
+                result = await asyncio.to_thread(setup) if thread else setup()
+            except Exception as e:
+                entry.update(state=FAILED, error=f"{type(e).__name__}: {e}",
+                             seconds=round(time.monotonic() - started, 3))
+                logger.error(f"{name} failed to start (attempt {entry['attempts']}): {e}")
+                self._check_ready()  # an optional one failing may leave the rest ready
+                if not retry:
+                    return
+                await asyncio.sleep(RETRY_INTERVAL)
+                continue
+
+            entry.update(state=UP, error=None, seconds=round(time.monotonic() - started, 3))
+            logger.info(f"{name} up in {entry['seconds']:.3f}s")
+            if on_up is not None:
+                on_up(result)
+            self._check_ready()
+            return
+
+    def _check_ready(self) -> None:
+        if self.ready_after is None and self.ready:
+            self.ready_after = self._since_start()
+            logger.info(f"Ready {self.ready_after:.2f}s after process start")
+
+    @property
+    def ready(self) -> bool:
+        # Nothing registered yet means the startup hook has not run
+        return bool(self.subsystems) and all(
+            entry["state"] == UP for entry in self.subsystems.values() if entry["required"])
+
+    @property
+    def degraded(self) -> bool:
+        return any(entry["state"] == FAILED for entry in self.subsystems.values() if not entry["required"])
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "degraded": self.degraded,
+            "uptime_s": self._since_start(),
+            "serving_after_s": self.serving_after,
+            "ready_after_s": self.ready_after,
+            "subsystems": {name: dict(entry) for name, entry in self.subsystems.items()},
+        }
+
+    def add_routes(self, app) -> None:
+        """Add GET /ready to app: 200 once every required subsystem is up, else 503."""
+
+        @app.get("/ready")
+        async def get_ready():
+            snapshot = self.snapshot()
+            return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
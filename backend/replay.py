@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Replay a game journal (journal.py) through the hub.
+
+Buzzer edges and status changes from the journal are fed into server.app
+in-process, with simulated hardware and in-process satellites, at real or
+accelerated speed. The report compares recorded and replayed round times
+and LED commands, e.g. to reproduce a bug seen at a fair or to check a
+change against real traffic.
+
+    cd backend
+    python replay.py journal.jsonl                 # real time
+    python replay.py journal.jsonl --speed 10      # ten times faster
+    python replay.py journal.jsonl --speed 0 --record replayed.jsonl
+
+The hub's 3 s pause after a win is not accelerated. Each hub start
+(an "open" event) continues the replay right away, so downtime and
+reboots, where the monotonic timestamps start over, are skipped.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# Must be set before the hub is imported
+parser = argparse.ArgumentParser(description="Replay a game journal through the hub")
+parser.add_argument("journal")
+parser.add_argument("--speed", type=float, default=1.0, help="time factor, 0 = as fast as possible")
+parser.add_argument("--round", type=int, action="append", dest="rounds",
+                    help="only replay these recorded rounds (repeatable)")
+parser.add_argument("--satellites", help="comma separated satellite names (default: hub config)")
+parser.add_argument("--record", default="", help="write the replay's own journal here")
+parser.add_argument("--out", help="write the report as JSON here")
+args = parser.parse_args()
+
+os.environ.setdefault("MESSE_HARDWARE", "sim")
+os.environ.setdefault("MESSE_LOG_LEVEL", "WARNING")
+os.environ["MESSE_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="messe-replay-"), "replay.sqlite")
+os.environ["MESSE_JOURNAL"] = args.record
+os.environ["MESSE_STATE_PATH"] = ""
+os.environ["MESSE_STATS_PATH"] = ""
+
+import httpx  # noqa: E402
+
+import journal  # noqa: E402
+import server  # noqa: E402
+from admission import Admission  # noqa: E402
+
+INPUTS = (journal.BUZZER, journal.STATUS)
+
+
+class Satellites:
+    """In-process satellites that count the LED commands they receive."""
+
+    def __init__(self):
+        self.leds = Counter()
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        name = request.url.host.split(".")[0]
+        if request.url.path.startswith("/led/"):
+            self.leds[f"{name}:{request.url.path.rsplit('/', 1)[1]}"] += 1
+        return httpx.Response(200, json={"message": "ok", "trace": None})
+
+
+def recorded_summary(events) -> tuple[dict, Counter]:
+    durations = {e["r"]: e["duration_ms"] for e in events if e["k"] == journal.ROUND_END}
+    leds = Counter(f"{e['station']}:{e['color']}" for e in events
+                   if e["k"] == journal.LED and e["station"] != "local" and e.get("color"))
+    return durations, leds
+
+
+async def replay(events: list[dict]) -> dict:
+    satellites = Satellites()
+    if args.satellites:
+        server.SATELLITES[:] = args.satellites.split(",")
+        server.statuses.clear()
+        server.statuses.update({"local": None, **{name: None for name in server.SATELLITES}})
+    server.satellite_transport = httpx.MockTransport(satellites.handle)
+    # The journal only holds updates the hub admitted, and replaying faster
+    # compresses them in time: no rate limit, or they would be refused with 429
+    server.admission = Admission(rate=None)
+    hub = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://hub")
+
+    replayed = {}  # recorded round -> replayed duration (ms)
+    current = None
+
+    def close_round():
+        if current is not None:
+            replayed[current] = server.round_timer.duration_ms()
+
+    inputs = [e for e in events if e["k"] in INPUTS]
+    started = time.monotonic()
+    base = None  # (journal t, local monotonic time) the next events are scheduled from
+    for event in events:
+        if event["k"] == journal.OPEN:
+            # A new hub process, maybe after a reboot where t started over:
+            # continue right away instead of waiting out (or skipping) the gap
+            base = None
+            continue
+        if event["k"] not in INPUTS:
+            continue
+        if base is None:
+            base = (event["t"], time.monotonic())
+        if args.speed > 0:
+            delay = base[1] + (event["t"] - base[0]) / 1e9 / args.speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if event["k"] == journal.BUZZER:
+            if event["pressed"]:
+                close_round()
+                current = event["r"]
+            await server.on_buzzer_edge(event["pressed"])
+        else:
+            response = await hub.post("/api/remote", json={
+                "satellite": event["station"], "id": event.get("id"), "status": event["status"]})
+            response.raise_for_status()
+
+    await asyncio.sleep(0.5)  # let the last evaluations reach the satellites
+    close_round()
+    await hub.aclose()
+
+    recorded, recorded_leds = recorded_summary(events)
+    rounds = []
+    for recorded_round, duration in replayed.items():
+        entry = {"round": recorded_round, "recorded_ms": recorded.get(recorded_round), "replayed_ms": duration}
+        if duration is not None and args.speed > 0:
+            entry["replayed_scaled_ms"] = round(duration * args.speed)
+        rounds.append(entry)
+    return {
+        "events": len(events),
+        "inputs": len(inputs),
+        "speed": args.speed,
+        "wall_s": round(time.monotonic() - started, 3),
+        "rounds": rounds,
+        "led_commands": {"recorded": dict(recorded_leds), "replayed": dict(satellites.leds)},
+    }
+
+
+def main():
+    events = list(journal.read(args.journal))
+    if args.rounds:
+        events = [e for e in events if e["r"] in args.rounds or e["k"] == journal.OPEN]
+    if all(e["k"] == journal.OPEN for e in events):
+        sys.exit("journal has no events to replay")
+
+    report = asyncio.run(replay(events))
+    server.journal.close()
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
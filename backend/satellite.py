@@ -1,49 +1,87 @@
+import asyncio
+import os
 import time
 import threading
 import requests
-from fastapi import FastAPI, Request
-from nfc_reader import (read_nfc, nfc_state)
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request
+from nfc_reader import (get_reader, read_nfc, nfc_state, read_timing)
 from led_controller import (LEDController)
+from hw_process import HW_PROCESS_ENABLED, HardwareProcess
+from answers import AnswerConfig, AnswerEngine
+from readiness import Readiness
+from animation import Timeline
+from tracing import SentTraces, new_trace_id
+import metrics
+from metrics import hub_calls, call_result
 from sat_config import SATELLITE_ID, CORRECT_ID
+import jsonlog
+import profiler
+
+jsonlog.setup_logging()
+log = jsonlog.get_logger(SATELLITE_ID)
 
 # =====================
 # CONFIG
 # =====================
 HUB_URL = "http://rpi4.local:8080/api/remote"   # <-- hub endpoint
 
-led = LEDController()
+if HW_PROCESS_ENABLED:
+    # NFC and LED live in a separate process, led is a proxy
+    hardware = HardwareProcess()
+    led = hardware.led
+else:
+    hardware = None
+    # GPIO is claimed in the startup hook, not on import
+    led = LEDController(lazy=True)
 
 # =====================
 # FastAPI setup
 # =====================
 app = FastAPI()
+metrics.instrument(app)
+jsonlog.add_routes(app)
+profiler.add_routes(app)
+readiness = Readiness()
+readiness.add_routes(app)
+metrics.nfc_gauges(read_timing)
 
 # =====================
 # NFC Logic
 # =====================
 
 game_active = False # game loop flag
+sent_traces = SentTraces()  # traces waiting for their LED command
+
+# CORRECT_ID is only the fallback until the hub pushes an answer config
+answers = AnswerEngine(os.path.join(os.path.dirname(__file__), 'answers.json'),
+                       defaults={SATELLITE_ID: CORRECT_ID})
 
 def check_nfc_id(nfc_id: str):
     """Check NFC ID and return classification."""
     if not nfc_id:
         return None
 
-    nfc_id = str(nfc_id)
-    if nfc_id == CORRECT_ID:
-        return "correct"
-    else:
-        return "wrong"
+    return answers.check(SATELLITE_ID, nfc_id)
+
+def backoff(error):
+    """Wait as long as the hub asks when it rate-limits this satellite."""
+    response = getattr(error, "response", None)
+    if response is not None and response.status_code == 429:
+        time.sleep(min(float(response.headers.get("Retry-After", 0.2)), 1.0))
 
 def nfc_processor():
     """Continuously poll NFC reader and send new detections to hub when game is active."""
     game_start_time = None
     last_sent_id = None  # Track what ID we last sent to avoid duplicate requests
+    checked_id = None  # card last checked; a retried send reuses its status
+    status = None
 
     while True:
         if not game_active:
             game_start_time = None
             last_sent_id = None  # Reset when game becomes inactive
+            checked_id = None
             time.sleep(0.1)
             continue
 
@@ -59,31 +97,40 @@ def nfc_processor():
 
             if current_id:
                 # New card detected
-                status = check_nfc_id(current_id)
-                print(f"[{SATELLITE_ID}] New ID detected: {status.upper()} - {current_id}")
-
-                # Send to hub
+                if current_id != checked_id:
+                    checked_id, status = current_id, check_nfc_id(current_id)
+                    log.info("New ID detected", id=current_id, status=status)
+
+                # Send to hub, with a trace so the hub can time tap -> LED
+                trace_id = new_trace_id()
+                detected = current_read.get("detected") or time.monotonic()
+                sent_traces.add(trace_id, detected)
                 try:
-                    requests.post(
+                    response = requests.post(
                         HUB_URL,
                         json={
                             "satellite": SATELLITE_ID,
                             "id": current_id,
-                            "status": status
+                            "status": status,
+                            "trace": {"id": trace_id, "detected": detected, "sent": time.monotonic()}
                         },
                         timeout=2
                     )
-                    print(f"[{SATELLITE_ID}] Sent new status to hub: {status}")
+                    response.raise_for_status()  # e.g. 429 when the hub rate-limits us: retry
+                    hub_calls.inc(call_result())
+                    log.info("Sent status to hub", status=status, trace=trace_id)
                     last_sent_id = current_id
                 except Exception as e:
-                    print(f"[{SATELLITE_ID}] Failed to send to hub: {e}")
+                    hub_calls.inc(call_result(e))
+                    log.warning("Hub call failed", error=str(e))
+                    backoff(e)
 
             elif last_sent_id is not None:
                 # Card was removed (current_id is None but we had sent something before)
-                print(f"[{SATELLITE_ID}] Card removed - clearing status")
+                log.info("Card removed, clearing status")
 
                 try:
-                    requests.post(
+                    response = requests.post(
                         HUB_URL,
                         json={
                             "satellite": SATELLITE_ID,
@@ -92,12 +139,18 @@ def nfc_processor():
                         },
                         timeout=2
                     )
-                    print(f"[{SATELLITE_ID}] Sent clear status to hub")
+                    response.raise_for_status()
+                    hub_calls.inc(call_result())
+                    log.info("Sent clear status to hub")
                     last_sent_id = None
+                    checked_id = None
                 except Exception as e:
-                    print(f"[{SATELLITE_ID}] Failed to send clear status to hub: {e}")
+                    hub_calls.inc(call_result(e))
+                    log.warning("Hub call failed", error=str(e))
+                    backoff(e)
 
-        time.sleep(0.1)
+        # Wake up as soon as a card appears or is removed
+        nfc_state.wait_for_change(0.1)
 
 # =====================
 # API ENDPOINTS
@@ -105,28 +158,59 @@ def nfc_processor():
 @app.get("/status")
 async def status():
     """Check that the satellite is alive."""
-    return {"satellite": SATELLITE_ID, "status": "running"}
+    return {"satellite": SATELLITE_ID, "status": "running", "answers_version": answers.config.version,
+            "game_active": game_active}
+
+@app.post("/api/answers")
+async def set_answers(config: dict):
+    """Hot-reload the answer config pushed by the hub."""
+    try:
+        version = AnswerConfig.from_dict(config).version
+        if version < answers.config.version:
+            # A late or repeated push must not roll back a newer config
+            raise HTTPException(status_code=409,
+                                detail=f"Answer config v{version} is older than v{answers.config.version}")
+        loaded = answers.load(config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid answer config: {e}")
+    except OSError as e:
+        log.error("Failed to save answers", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Could not save answer config: {e}")
+    log.info("Answers reloaded", version=loaded.version, round=loaded.round)
+    return {"satellite": SATELLITE_ID, "version": loaded.version}
 
 @app.get("/led/red")
-async def red_led():
+async def red_led(trace: Optional[str] = None):
     led.set_color((1, 0, 0))  # constant red
-    return {"message": "Red LED on"}
+    return {"message": "Red LED on", "trace": sent_traces.close(trace)}
 
 @app.get("/led/green")
-async def green_led():
+async def green_led(trace: Optional[str] = None):
     led.set_color((0, 1, 0))  # constant green
-    return {"message": "Green LED on"}
+    return {"message": "Green LED on", "trace": sent_traces.close(trace)}
+
+@app.get("/led/off")
+async def off_led(trace: Optional[str] = None):
+    led.turn_off()  # sequence in progress
+    return {"message": "LED off", "trace": sent_traces.close(trace)}
+
+def clear_nfc():
+    """Forget the cards on the reader; one still lying there is reported again."""
+    nfc_state.clear()
+    if hardware is not None:
+        hardware.clear_nfc()
 
 @app.get("/api/unlock")
 async def unlock_game():
     global game_active
 
     # Clear NFC state completely
-    nfc_state.last_read = {"id": None, "timestamp": None}
+    clear_nfc()
+    answers.reset_progress()
 
     game_active = True
     led.turn_off()  # Clear LED state
-    print(f"[{SATELLITE_ID}] Game unlocked — NFC state cleared and ready to read NFCs")
+    log.info("Game unlocked, NFC state cleared")
     return {"message": "Game unlocked"}
 
 @app.get("/api/lock")
@@ -135,10 +219,10 @@ async def lock_game():
     game_active = False
 
     # Clear NFC state completely
-    nfc_state.last_read = {"id": None, "timestamp": None}
+    clear_nfc()
 
     led.turn_off()
-    print(f"[{SATELLITE_ID}] Game locked — NFCs ignored")
+    log.info("Game locked, NFCs ignored")
     return {"message": "Game locked"}
 
 @app.get("/api/reset")
@@ -146,24 +230,35 @@ async def reset_satellite():
     """Reset the satellite state after a game"""
 
     # Clear NFC state completely
-    nfc_state.last_read = {"id": None, "timestamp": None}
+    clear_nfc()
 
     # Turn off local LED
     led.turn_off()
-    print(f"[{SATELLITE_ID}] Satellite reset completed - NFC state cleared")
+    log.info("Satellite reset, NFC state cleared")
     return {"message": f"{SATELLITE_ID} reset successful"}
 
+@app.get("/api/clock")
+async def clock():
+    """Clock probe for the hub's offset estimation (clocksync.py)."""
+    return {"wall": time.time(), "mono": time.monotonic()}
+
 @app.post("/api/idle-start")
 async def idle_start(req: Request):
     data = await req.json()
     start_ts = data.get("timestamp", time.time())  # fallback to local time if missing
-    print(f"[IDLE] Starting idle mode at hub timestamp {start_ts}")
-    led.start_idle_mode(start_ts)
+    log.info("Starting idle mode", timestamp=start_ts)
+    timeline = data.get("timeline")
+    if timeline is not None:
+        try:
+            Timeline(timeline, SATELLITE_ID)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    led.start_idle_mode(start_ts, timeline)
     return {"status": "idle_started", "timestamp": start_ts}
 
 @app.post("/api/idle-stop")
 async def idle_stop():
-    print(f"[IDLE] {SATELLITE_ID} is stopping the idle mode")
+    log.info("Stopping idle mode")
     led.stop_idle_mode()
     return {"status": "idle_stopped"}
 
@@ -172,11 +267,36 @@ async def idle_stop():
 # =====================
 @app.on_event("startup")
 async def startup_event():
-    nfc_thread = threading.Thread(target=read_nfc, daemon=True)
-    processor_thread = threading.Thread(target=nfc_processor, daemon=True)
-
-    nfc_thread.start()
+    processor_thread = threading.Thread(target=nfc_processor, name="nfc_processor", daemon=True)
     processor_thread.start()
+    asyncio.create_task(metrics.monitor_loop_lag())
+    start_subsystems()  # registered before the first request, so /ready reports them
+    readiness.serving()
+
+def start_subsystems():
+    """Bring up the hardware in the background; without it the satellite runs degraded (GET /ready)."""
+    def start_pump(_):
+        asyncio.create_task(hardware.pump(
+            on_nfc=lambda uid, ts: nfc_state.update(uid, ts),
+            on_nfc_removed=lambda uid, ts: nfc_state.remove(uid, ts),
+            on_buzzer=None,
+        ))
+
+    def start_nfc(_):
+        nfc_thread = threading.Thread(target=read_nfc, name="read_nfc", daemon=True)
+        nfc_thread.start()
+
+    if hardware is not None:
+        # Forked on the event loop (the main thread), not from a worker thread
+        readiness.start("hardware", hardware.start, required=False, on_up=start_pump, thread=False)
+    else:
+        readiness.start("led", led.open, required=False)
+        readiness.start("nfc", get_reader, required=False, on_up=start_nfc)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if hardware is not None:
+        hardware.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""
+Server-side search over the score tables for the admin page.
+
+    GET /api/search/all_scores?q=ann&date_from=2025-03-01&time_max=00:02&sort=time&limit=50
+    GET /api/search/all_scores?...&cursor=<next from the previous page>
+
+q matches name prefixes through the FTS5 index from db.py (every word must
+match; LIKE when SQLite has no FTS5). Dates filter created_at (a plain date
+in date_to includes that day), times filter the score and may be given
+shortened, e.g. 00:02. Pages are keyset-paginated on (sort column, id), so
+each page costs the same no matter how deep the admin scrolls.
+"""
+import base64
+import json
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from archive import TIME_FORMAT
+from db import SCORE_TABLES, db
+
+SORTS = ("time", "created_at", "name", "id")
+MAX_LIMIT = 500
+
+
+def match_query(q: str) -> str:
+    """FTS5 query: every word as a quoted prefix."""
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in q.split())
+
+
+def full_time(value: str) -> str:
+    """Complete a shortened time like 00:02 to 00:02:00.000."""
+    value = value + "00:00:00.000"[len(value):]
+    if not TIME_FORMAT.match(value):
+        raise HTTPException(status_code=400, detail=f"Invalid time {value}, expected HH:MM:SS.mmm")
+    return value
+
+
+def encode_cursor(row: dict, sort: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([row[sort], row["id"]]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return [value, int(row_id)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def search(table: str, q: str = "", date_from: str = None, date_to: str = None,
+           time_min: str = None, time_max: str = None, sort: str = "time", order: str = "asc",
+           limit: int = 50, cursor: str = None) -> dict:
+    if table not in SCORE_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table {table}")
+    if sort not in SORTS or order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(SORTS)}, order asc or desc")
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    db.init()  # db.fts is known once the schema is set up
+    where, params = [], []
+    if q.strip():
+        if db.fts:
+            where.append(f"id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)")
+            params.append(match_query(q))
+        else:
+            where.append("name LIKE ? ESCAPE '\\'")
+            params.append("%" + q.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+    if date_from:
+        where.append("created_at >= ?")
+        params.append(date_from)
+    if date_to:
+        # A plain date means up to the end of that day
+        where.append("created_at < datetime(?, '+1 day')" if len(date_to) == 10 else "created_at <= ?")
+        params.append(date_to)
+    if time_min:
+        where.append("time >= ?")
+        params.append(full_time(time_min))
+    if time_max:
+        where.append("time <= ?")
+        params.append(full_time(time_max))
+    if cursor:
+        where.append(f"({sort}, id) {'>' if order == 'asc' else '<'} (?, ?)")
+        params.extend(decode_cursor(cursor))
+
+    sql = f"SELECT id, name, time, created_at FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    direction = order.upper()
+    sql += f" ORDER BY {sort} {direction}, id {direction} LIMIT ?"
+    # One row more than asked for tells whether there is a next page
+    params.append(limit + 1)
+
+    with db.get_connection() as conn:
+        rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return {"rows": rows, "next": encode_cursor(rows[-1], sort) if more else None}
+
+
+def add_routes(app) -> None:
+    """Add the /api/search endpoint to app."""
+
+    @app.get("/api/search/{table}")
+    async def search_table(table: str, q: str = "", date_from: str = None, date_to: str = None,
+                           time_min: str = None, time_max: str = None, sort: str = "time",
+                           order: str = "asc", limit: int = 50, cursor: str = None):
+        return await run_in_threadpool(search, table, q, date_from, date_to, time_min, time_max,
+                                       sort, order, limit, cursor)
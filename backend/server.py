@@ -5,17 +5,56 @@ import time
 from asyncio import AbstractEventLoop
 import httpx
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import List, Optional
-from nfc_reader import nfc_state, read_nfc
+from nfc_reader import get_reader, nfc_state, read_nfc, read_timing
 from db import db
 from led_controller import LEDController
-import RPi.GPIO as GPIO
+from hw_process import HW_PROCESS_ENABLED, HardwareProcess
+from answers import AnswerEngine
+from admission import Admission, EvaluationQueue
+from analytics import SAVE_INTERVAL, analytics
+from animation import Timeline, classic_timeline
+from clocksync import ClockSync
+from game_timer import RoundTimer, format_duration, to_ns
+from readiness import Readiness
+from journal import journal, BUZZER, STATUS, LED, LED_ACK, COMMAND, ROUND_END, RESTORE
+from snapshot import STATE_PATH, Snapshotter
+from static_files import PrecompressedStaticFiles
+from tracing import TraceAggregator, new_trace_id, remote_stages, local_stages
+import archive
+import metrics
+from metrics import satellite_calls, buzzer_events, call_result
+import jsonlog
+import leaderboard
+import profiler
+import search
+from hal import create_buzzer
+
+jsonlog.setup_logging()
+log = jsonlog.get_logger("hub")
+
+BUZZER_PIN = 17
 
 app = FastAPI()
-led = LEDController()
+metrics.instrument(app)
+jsonlog.add_routes(app)
+profiler.add_routes(app)
+archive.add_routes(app)
+search.add_routes(app)
+leaderboard.add_routes(app)
+readiness = Readiness()
+readiness.add_routes(app)
+if HW_PROCESS_ENABLED:
+    # GPIO, NFC and LED live in a separate process, led is a proxy
+    hardware = HardwareProcess(buzzer_pin=BUZZER_PIN, station="local")
+    led = hardware.led
+else:
+    hardware = None
+    # GPIO is claimed in the startup hook (init_subsystems), not on import
+    led = LEDController(station="local", lazy=True)
 led_lock = threading.Lock()
 main_loop: Optional[AbstractEventLoop] = None
 
@@ -46,32 +85,181 @@ SATELLITE_IPS = {
     "stl4": "172.16.15.84:8080"
 }
 
-CORRECT_ID = "584194412400"
+SATELLITES = list(SATELLITE_IPS)
 
-BUZZER_PIN = 17
+# httpx transport for hub -> satellite calls; None means real HTTP.
+# The benchmark swaps in an in-process transport.
+satellite_transport = None
+
+def satellite_url(name: str, path: str) -> str:
+    return f"http://{name}.local:8080{path}"
+
+def satellite_client(timeout: float) -> httpx.AsyncClient:
+    return httpx.AsyncClient(timeout=timeout, transport=satellite_transport)
+
+CORRECT_ID = "584194412400"
+HEALTH_CHECK_INTERVAL = 30.0  # seconds between /status checks of the satellites
+WIN_PAUSE = 3.0  # seconds the win is shown before the game is locked and reset
+# LED colour per station status; a sequence in progress turns it off (a wrong card before left it red)
+LED_COLORS = {"correct": "green", "wrong": "red", "partial": "off"}
+
+# uvicorn for `python server.py`; "auto" uses uvloop and httptools where installed (uvicorn[standard])
+UVICORN_LOOP = os.environ.get("MESSE_UVICORN_LOOP", "auto")
+UVICORN_HTTP = os.environ.get("MESSE_UVICORN_HTTP", "auto")
+UVICORN_BACKLOG = int(os.environ.get("MESSE_UVICORN_BACKLOG", "2048"))
+# Longer than the UI's 5 s leaderboard refresh, so it keeps its connection between polls
+UVICORN_KEEP_ALIVE = int(os.environ.get("MESSE_UVICORN_KEEP_ALIVE", "15"))
+
+buzzer = None  # buzzer input backend, created in setup_buzzer
 buzzer_clicked = False  # short-lived event flag
 game_active = False # flag for game loop
 
 all_statuses_initialized = False
 
+idle_state = None  # {"start", "timeline"} while the idle show runs
+satellite_health = {}  # name -> {"ok", "last_ok", "failures"}
+snapshots = Snapshotter(STATE_PATH)  # crash-safe copy of the state above
+
+trace_stats = TraceAggregator()  # tap -> LED latency per station and stage
+round_timer = RoundTimer()  # buzzer -> last correct status, on the hub's monotonic clock
+metrics.nfc_gauges(read_timing)
+clocks = ClockSync(SATELLITES)  # satellite clock offsets for idle effects and traces
+metrics.clock_gauges(clocks)
+
+def finish_round_if_won(ts_ns: int):
+    """Stop the round clock when the last correct status arrives."""
+    if game_active and all(status == "correct" for status in statuses.values()):
+        duration = round_timer.finish(ts_ns)
+        if duration is not None:
+            journal.record(ROUND_END, ts_ns, duration_ms=duration)
+            analytics.round_finished(duration)
+            log.info("Round finished", round=round_timer.round, duration_ms=duration)
+
+def count_satellite_call(name: str, endpoint: str, error: Exception = None):
+    result = call_result(error)
+    satellite_calls.inc(name, endpoint, result)
+    if endpoint != "led":  # LED commands are journaled with their colour
+        journal.record(COMMAND, station=name, endpoint=endpoint, result=result)
+
+    health = satellite_health.setdefault(name, {"ok": None, "last_ok": None, "failures": 0})
+    ok = result == "ok"
+    if ok:
+        health["last_ok"] = time.time()
+        health["failures"] = 0
+    else:
+        health["failures"] += 1
+    if health["ok"] != ok:
+        health["ok"] = ok
+        save_state()
+
+def save_state():
+    """Queue a snapshot of the game state; call after every change."""
+    snapshots.save({
+        "round": round_timer.to_dict(),
+        "statuses": dict(statuses),
+        "game_active": game_active,
+        "all_statuses_initialized": all_statuses_initialized,
+        "idle": idle_state,
+        "satellites": {name: dict(health) for name, health in satellite_health.items()},
+    })
+
+def restore_state() -> bool:
+    """Continue from the last snapshot after a restart; False if there is none."""
+    global game_active, all_statuses_initialized, idle_state
+    state = snapshots.load()
+    if state is None:
+        return False
+
+    # After a reboot a running round's clock cannot be continued, so it could
+    # never finish or be saved: drop it and wait for the next buzzer press
+    abandoned = state["game_active"] and not state["same_boot"]
+    if abandoned:
+        log.warning("Abandoned the round running before the reboot", round=state["round"].get("round"))
+    else:
+        for key, value in state["statuses"].items():
+            if key in statuses:
+                statuses[key] = value
+        game_active = state["game_active"]
+        all_statuses_initialized = state["all_statuses_initialized"]
+    round_timer.restore(state["round"], same_boot=state["same_boot"])
+    journal.round = round_timer.round
+    satellite_health.update(state["satellites"])
+    idle_state = state["idle"]
+    if idle_state is not None:
+        led.start_idle_mode(idle_state["start"], idle_state["timeline"])
+
+    journal.record(RESTORE, saved_at=state["saved_at"], same_boot=state["same_boot"])
+    log.info("Restored hub state", round=round_timer.round, game_active=game_active,
+             age_s=round(time.time() - state["saved_at"], 1), same_boot=state["same_boot"])
+    if abandoned:
+        save_state()
+    return True
+
+async def fetch_status(client: httpx.AsyncClient, name: str) -> Optional[dict]:
+    """A satellite's /status, None if it is not reachable."""
+    try:
+        response = await client.get(satellite_url(name, "/status"))
+        response.raise_for_status()
+        remote = response.json()
+        count_satellite_call(name, "status")
+        return remote
+    except Exception as e:
+        count_satellite_call(name, "status", e)
+        log.warning("Satellite call failed", satellite=name, endpoint="status", error=str(e))
+        return None
+
+async def check_satellites():
+    """Periodic health check; catches up satellites that missed an answers push while offline."""
+    async with satellite_client(2.0) as client:
+        async def check(name: str):
+            remote = await fetch_status(client, name)
+            if remote is not None:
+                await sync_answers(name, remote.get("answers_version"))
+
+        while True:
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+            await asyncio.gather(*(check(name) for name in SATELLITES))
+
+async def resync_satellites():
+    """After a restore: bring live satellites in line with the restored game state."""
+    async def resync(name: str):
+        async with satellite_client(2.0) as client:
+            remote = await fetch_status(client, name)
+        if remote is None:
+            return
+        await sync_answers(name, remote.get("answers_version"))
+        # Satellites keep their card state; only a mismatched lock needs fixing
+        if remote.get("game_active") is not None and remote["game_active"] != game_active:
+            if game_active:
+                await notify_satellite_unlock(name)
+            else:
+                await lock_satellite(name)
+
+    await asyncio.gather(*(resync(name) for name in SATELLITES))
+    # Re-apply the LEDs for the restored statuses
+    if game_active and all(value is not None for value in statuses.values()):
+        await evaluate_and_trigger()
+    log.info("Satellites resynchronised")
+
+# CORRECT_ID is only the fallback when answers.json does not cover the local station
+answers = AnswerEngine(os.path.join(os.path.dirname(__file__), 'answers.json'),
+                       defaults={"local": CORRECT_ID})
+
 def check_nfc_id(nfc_id):
     if not nfc_id:
         return None
 
-    # Convert to string to ensure consistent comparison
-    nfc_id = str(nfc_id)
-
-    if nfc_id == CORRECT_ID:
-        print(f"[NFC] CORRECT ID detected: {nfc_id}")
-        return "correct"
-    else:
-        print(f"[NFC] WRONG ID detected: {nfc_id}")
-        return "wrong"
+    status = answers.check("local", nfc_id)
+    log.info("Local ID checked", id=nfc_id, status=status)
+    return status
 
 class UserSave(BaseModel):
     name: str
     time: str
 
+class ScoreSave(BaseModel):
+    name: str  # the time comes from the hub's round timer
+
 class NameCheck(BaseModel):
     name: str
 
@@ -83,33 +271,57 @@ class UserModify(BaseModel):
 # -----------------------
 # Endpoint for satellites
 # -----------------------
+class RemoteTrace(BaseModel):
+    """Tap trace started on the satellite, timestamps on its monotonic clock."""
+    id: str
+    detected: float
+    sent: float
+
 class RemoteNFC(BaseModel):
     satellite: str  # e.g., 'stl1'
     id: Optional[str] = None
     status: Optional[str] = None  # 'correct', 'wrong', or None
+    trace: Optional[RemoteTrace] = None
 
 @app.post("/api/remote")
 async def receive_remote(remote: RemoteNFC):
     global all_statuses_initialized
 
     if not game_active:
-        print(f"[HUB] Ignoring {remote.satellite} update (game not active)")
+        log.info("Ignoring update, game not active", satellite=remote.satellite)
         return {"message": "Game not active"}
 
     if remote.satellite not in statuses:
-        print(f"[HUB] Unknown satellite: {remote.satellite}")
+        log.warning("Unknown satellite", satellite=remote.satellite)
         return {"message": "Unknown satellite"}
 
+    result, retry_after = admission.admit(remote.satellite, remote.id, remote.status, statuses[remote.satellite])
+    if result == "rate_limited":
+        log.warning("Satellite rate limited", satellite=remote.satellite)
+        return JSONResponse({"message": "Too many updates"}, status_code=429,
+                            headers={"Retry-After": f"{retry_after:.2f}"})
+    if result == "duplicate":
+        return {"message": "Duplicate update"}
+
+    received = time.monotonic()
     statuses[remote.satellite] = remote.status
-    print(f"[HUB] Updated {remote.satellite} -> {remote.status}")
+    journal.record(STATUS, to_ns(received), station=remote.satellite, status=remote.status, id=remote.id)
+    analytics.answer(remote.satellite, remote.status)
+    log.info("Status updated", satellite=remote.satellite, status=remote.status)
+    finish_round_if_won(to_ns(received))
+
+    trace = None
+    if remote.trace is not None and remote.status is not None:
+        trace = {**dict(remote.trace), "station": remote.satellite, "received": received}
 
     # Always trigger evaluation when we have a status update
     if all(value is not None for value in statuses.values()):
         if not all_statuses_initialized:
             all_statuses_initialized = True
 
-        asyncio.create_task(evaluate_and_trigger())
+        evaluation_queue.submit(trace)
 
+    save_state()
     return {"message": "Status updated"}
 
 
@@ -125,6 +337,7 @@ def local_nfc_processor():
             # Clear local status when game is not active
             if statuses["local"] is not None:
                 statuses["local"] = None
+                save_state()
                 with led_lock:
                     led.turn_off()
             last_processed_id = None
@@ -135,29 +348,49 @@ def local_nfc_processor():
             if current_id != last_processed_id:
                 status = check_nfc_id(current_id)
                 statuses["local"] = status
-                print(f"[HUB] Local reader -> {status}")
+                journal.record(STATUS, station="local", status=status, id=current_id)
+                analytics.answer("local", status)
+                log.info("Status updated", satellite="local", status=status)
+                finish_round_if_won(time.monotonic_ns())
                 last_processed_id = current_id
 
                 if all(value is not None for value in statuses.values()):
                     if not all_statuses_initialized:
                         all_statuses_initialized = True
 
+                    now = time.monotonic()
+                    trace = {
+                        "id": new_trace_id(),
+                        "station": "local",
+                        "detected": current_read.get("detected") or now,
+                        "sent": now,
+                        "received": now,
+                    }
                     global main_loop
                     if main_loop is not None:
-                        asyncio.run_coroutine_threadsafe(evaluate_and_trigger(), main_loop)
+                        main_loop.call_soon_threadsafe(evaluation_queue.submit, trace)
                     else:
-                        print("[NFC] main_loop not yet initialized")
+                        log.warning("main_loop not yet initialized")
+                save_state()
         else:
             if statuses["local"] is not None:
                 statuses["local"] = None
+                journal.record(STATUS, station="local", status=None, id=None)
+                save_state()
             last_processed_id = None
 
-        time.sleep(0.1)
+        # Wake up as soon as a card appears or is removed
+        nfc_state.wait_for_change(0.1)
 
-async def evaluate_and_trigger():
-    """Check current statuses and trigger LEDs individually."""
+async def evaluate_and_trigger(trace: Optional[dict] = None):
+    """Check current statuses and trigger LEDs individually.
+
+    trace is the tap that caused this evaluation; its station's LED closes it.
+    """
 
     global statuses
+    if trace is not None:
+        trace["evaluated"] = time.monotonic()
 
     # --- Local LED ---
     local_status = statuses.get("local")
@@ -168,170 +401,287 @@ async def evaluate_and_trigger():
             led.set_color((1, 0, 0))
         else:
             led.turn_off()
+    journal.record(LED, station="local", color=LED_COLORS.get(local_status))
+    if trace is not None and trace["station"] == "local":
+        trace_stats.record("local", trace["id"], local_stages(trace, time.monotonic()))
 
     # --- Satellite LEDs ---
-    async def trigger_satellite(name: str, i: int):
-        status = statuses.get(name)
-        if status == "correct":
-            color_name = "green"
-        elif status == "wrong":
-            color_name = "red"
-        else:
+    async def trigger_satellite(name: str):
+        color_name = LED_COLORS.get(statuses.get(name))
+        if color_name is None:
             return  # unknown/off, do nothing
 
-        url = f"http://stl{i}.local:8080/led/{color_name}"
+        url = satellite_url(name, f"/led/{color_name}")
+        traced = trace is not None and trace["station"] == name
+        params = {"trace": trace["id"]} if traced else None
         try:
-            async with httpx.AsyncClient(timeout=3.0) as client:
-                response = await client.get(url)
+            async with satellite_client(3.0) as client:
+                led_sent = time.monotonic()
+                journal.record(LED, to_ns(led_sent), station=name, color=color_name)
+                response = await client.get(url, params=params)
+                led_acked = time.monotonic()
+                journal.record(LED_ACK, to_ns(led_acked), station=name, color=color_name,
+                               result="ok" if response.status_code == 200 else "error",
+                               rtt_ms=round((led_acked - led_sent) * 1000, 3))
                 if response.status_code == 200:
-                    print(f"[HUB] Triggered light on {name} ({color_name})")
+                    count_satellite_call(name, "led")
+                    log.info("Triggered light", satellite=name, color=color_name)
+                    if traced:
+                        ack = response.json().get("trace")
+                        trace_stats.record(name, trace["id"],
+                                           remote_stages(trace, led_sent, led_acked, ack,
+                                                         clocks.mono_offset(name)))
                 else:
-                    print(f"[HUB] {name} responded with {response.status_code}")
+                    # Counted like a failed call, so the satellite's health reflects it too
+                    count_satellite_call(name, "led", RuntimeError(f"HTTP {response.status_code}"))
+                    log.warning("LED call failed", satellite=name, status_code=response.status_code)
         except Exception as e:
-            print(f"[HUB] Failed to trigger {name}: {e}")
+            count_satellite_call(name, "led", e)
+            journal.record(LED_ACK, station=name, color=color_name, result=call_result(e))
+            log.warning("LED call failed", satellite=name, error=str(e))
 
-    satellites = [("stl1", 1), ("stl2", 2), ("stl3", 3), ("stl4", 4)]
-    await asyncio.gather(*(trigger_satellite(name, i) for name, i in satellites))
+    await asyncio.gather(*(trigger_satellite(name) for name in SATELLITES))
 
     # --- Reset game state after victory ---
     if all(status == "correct" for status in statuses.values()):
         async def reset_game_state():
-            await asyncio.sleep(3)
+            await asyncio.sleep(WIN_PAUSE)
 
             global game_active
             game_active = False
-            await asyncio.gather(*(lock_satellite(i) for i in range(1, 5)))
-            print("[GAME] All correct — game locked and waiting for next start")
+            await asyncio.gather(*(lock_satellite(name) for name in SATELLITES))
+            log.info("All correct, game locked and waiting for next start")
 
             # Clear everything after game ends
             for key in statuses:
                 statuses[key] = None
 
             # Notify satellites to reset everything
-            await asyncio.gather(*(notify_satellite_reset(i) for i in range(1, 5)))
+            await asyncio.gather(*(notify_satellite_reset(name) for name in SATELLITES))
 
             # Reset global flag
             global all_statuses_initialized
             all_statuses_initialized = False
+            save_state()
 
             with led_lock:
                 led.turn_off()
 
-            print("[HUB] Game state fully reset, ready for next round")
+            log.info("Game state fully reset, ready for next round")
 
         asyncio.create_task(reset_game_state())
 
+# Status updates are admitted per satellite; evaluations pile up at most one deep
+admission = Admission()
+evaluation_queue = EvaluationQueue(evaluate_and_trigger)
+
 def setup_buzzer():
-    GPIO.setmode(GPIO.BCM)
-    GPIO.setup(BUZZER_PIN, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
-    print(f"[BUZZER] Pin {BUZZER_PIN} ready for polling")
+    global buzzer
+    buzzer = create_buzzer(BUZZER_PIN)
+    log.info("Buzzer ready for polling", pin=BUZZER_PIN)
 
 def buzzer_pressed(channel):
-    print("[BUZZER] Button pressed (pin 15 -> LOW)")
+    log.info("Buzzer pressed", channel=channel)
 
 # Unlock all satellites for the new game
-async def notify_satellite_unlock(i: int):
-    url = f"http://stl{i}.local:8080/api/unlock"
+async def notify_satellite_unlock(name: str):
+    url = satellite_url(name, "/api/unlock")
     try:
-        async with httpx.AsyncClient(timeout=2.0) as client:
+        async with satellite_client(2.0) as client:
             await client.get(url)
-            print(f"[HUB] Unlocked stl{i}")
+            count_satellite_call(name, "unlock")
+            log.info("Satellite unlocked", satellite=name)
     except Exception as e:
-        print(f"[HUB] Failed to unlock stl{i}: {e}")
+        count_satellite_call(name, "unlock", e)
+        log.warning("Satellite call failed", satellite=name, endpoint="unlock", error=str(e))
 
-async def lock_satellite(i: int):
-    url = f"http://stl{i}.local:8080/api/lock"
+async def lock_satellite(name: str):
+    url = satellite_url(name, "/api/lock")
     try:
-        async with httpx.AsyncClient(timeout=2.0) as client:
+        async with satellite_client(2.0) as client:
             await client.get(url)
-            print(f"[HUB] Locked stl{i}")
+            count_satellite_call(name, "lock")
+            log.info("Satellite locked", satellite=name)
     except Exception as e:
-        print(f"[HUB] Failed to lock stl{i}: {e}")
+        count_satellite_call(name, "lock", e)
+        log.warning("Satellite call failed", satellite=name, endpoint="lock", error=str(e))
 
 
-async def notify_satellite_reset(i: int):
-    url = f"http://stl{i}.local:8080/api/reset"
+async def notify_satellite_reset(name: str):
+    url = satellite_url(name, "/api/reset")
     try:
-        async with httpx.AsyncClient(timeout=2.0) as client:
+        async with satellite_client(2.0) as client:
             await client.get(url)
-            print(f"[HUB] Notified stl{i} to reset last_processed_id")
+            count_satellite_call(name, "reset")
+            log.info("Satellite reset", satellite=name)
     except Exception as e:
-        print(f"[HUB] Failed to notify stl{i}: {e}")
+        count_satellite_call(name, "reset", e)
+        log.warning("Satellite call failed", satellite=name, endpoint="reset", error=str(e))
 
 async def reset_all_satellites():
     """Notify all satellites to reset their state."""
-    print("[HUB] Resetting all satellites for new game...")
+    log.info("Resetting all satellites for new game")
 
-    await asyncio.gather(*(notify_satellite_reset(i) for i in range(1, 5)))
+    await asyncio.gather(*(notify_satellite_reset(name) for name in SATELLITES))
 
     # Reset local statuses and flags
     for key in statuses:
         statuses[key] = None
     global all_statuses_initialized
     all_statuses_initialized = False
-    print("[HUB] Local statuses cleared and ready for new game")
+    save_state()
+    log.info("Local statuses cleared and ready for new game")
 
-async def buzzer_polling():
+def clear_nfc():
+    """Forget the cards on the local reader; one still lying there is reported again."""
+    nfc_state.clear()
+    if hardware is not None:
+        hardware.clear_nfc()
+
+async def on_buzzer_edge(pressed: bool, ts: float = None):
     global buzzer_clicked
-    last_state = GPIO.input(BUZZER_PIN)
-    print(f"[BUZZER] Starting poll. Initial state: {last_state}")
+    buzzer_events.inc("pressed" if pressed else "released")
+    edge_ns = to_ns(ts)
+    if pressed:
+        # The round starts at the edge itself, not after the satellites are unlocked
+        round_id = round_timer.start(edge_ns)
+        journal.round = round_id
+        journal.record(BUZZER, edge_ns, pressed=True)
+        log.info("Buzzer pressed", round=round_id)
+        buzzer_clicked = True
+
+        # Clear everything before starting new game
+        log.info("Clearing all statuses and states for new game")
+
+        # Clear server-side NFC state
+        clear_nfc()
+
+        for key in statuses:
+            statuses[key] = None
+        global all_statuses_initialized
+        all_statuses_initialized = False
+        answers.reset_progress()
+
+        # Reset and start a new game
+        await reset_all_satellites()
+        global game_active
+        game_active = True
+        save_state()
+        await asyncio.gather(*(notify_satellite_unlock(name) for name in SATELLITES))
+        log.info("Game unlocked, NFC reads enabled")
+    else:
+        journal.record(BUZZER, edge_ns, pressed=False)
+        log.info("Buzzer released")
+        buzzer_clicked = False
+
+async def buzzer_polling():
+    last_state = buzzer.read()
+    log.info("Buzzer polling started", state=last_state)
 
     while True:
-        current_state = GPIO.input(BUZZER_PIN)
+        current_state = buzzer.read()
 
         if current_state != last_state:
-            if current_state == 1:
-                print("[BUZZER] Rising edge detected -> Button PRESSED")
-                buzzer_clicked = True
-
-                # Clear everything before starting new game
-                print("[GAME] Clearing all statuses and states for new game...")
+            await on_buzzer_edge(current_state == 1)
+            last_state = current_state
 
-                # Clear server-side NFC state
-                nfc_state.last_read = {"id": None, "timestamp": None}
+        await asyncio.sleep(0.05)
 
-                for key in statuses:
-                    statuses[key] = None
-                global all_statuses_initialized
-                all_statuses_initialized = False
 
-                # Reset and start a new game
-                await reset_all_satellites()
-                global game_active
-                game_active = True
-                await asyncio.gather(*(notify_satellite_unlock(i) for i in range(1, 5)))
-                print("[GAME] Game unlocked — NFC reads enabled!")
+async def clock_sync():
+    # One long-lived client: probes reuse the connection, so no handshake skews the RTT
+    async with satellite_client(1.0) as client:
+        async def probe(name: str) -> dict:
+            response = await client.get(satellite_url(name, "/api/clock"))
+            response.raise_for_status()
+            return response.json()
 
-            elif current_state == 0:
-                print("[BUZZER] Falling edge detected -> Button RELEASED")
-                buzzer_clicked = False
+        await clocks.run(probe)
 
-            last_state = current_state
 
-        await asyncio.sleep(0.05)
-
-
-# start-up event starts NFC reading
+# start-up event: in-process work only, the subsystems come up in the background
 @app.on_event("startup")
 async def startup_event():
     global main_loop
     main_loop = asyncio.get_running_loop()
-    setup_buzzer()
-    threading.Thread(target=read_nfc, daemon=True).start()
-    threading.Thread(target=local_nfc_processor, daemon=True).start()
-
-    # Create the buzzer polling task
-    asyncio.create_task(buzzer_polling())
+    threading.Thread(target=local_nfc_processor, name="local_nfc_processor", daemon=True).start()
+    asyncio.create_task(metrics.monitor_loop_lag())
+    asyncio.create_task(clock_sync())
+    asyncio.create_task(check_satellites())
+    if restore_state():
+        asyncio.create_task(resync_satellites())
+    # Registered before the first request is served, so /ready waits for them
+    asyncio.create_task(report_subsystems(start_subsystems()))
+    readiness.serving()
+
+def start_subsystems() -> list[asyncio.Task]:
+    """Set up database, stats and hardware in parallel; the UI is served meanwhile.
+
+    Only the database is required. Without LED, NFC reader or buzzer the hub
+    runs degraded; every failed subsystem is retried (see GET /ready).
+    """
+    def start_pump(_):
+        # Buzzer edges and NFC reads arrive from the hardware process
+        asyncio.create_task(hardware.pump(
+            on_nfc=lambda uid, ts: nfc_state.update(uid, ts),
+            on_nfc_removed=lambda uid, ts: nfc_state.remove(uid, ts),
+            on_buzzer=on_buzzer_edge,
+        ))
+
+    def start_nfc(_):
+        threading.Thread(target=read_nfc, name="read_nfc", daemon=True).start()
+
+    def start_buzzer(_):
+        asyncio.create_task(buzzer_polling())
+
+    def start_saving(_):
+        # Not before the stats are loaded, or a save would overwrite them
+        asyncio.create_task(save_analytics())
+
+    tasks = [
+        readiness.start("db", db.init),
+        readiness.start("analytics", analytics.load, required=False, on_up=start_saving, retry=False),
+    ]
+    if hardware is not None:
+        # Forked on the event loop (the main thread), not from a worker thread
+        tasks.append(readiness.start("hardware", hardware.start, required=False, on_up=start_pump,
+                                     thread=False))
+    else:
+        tasks += [
+            readiness.start("led", led.open, required=False),
+            readiness.start("nfc", get_reader, required=False, on_up=start_nfc),
+            readiness.start("buzzer", setup_buzzer, required=False, on_up=start_buzzer),
+        ]
+    return tasks
+
+async def report_subsystems(tasks: list[asyncio.Task]):
+    await asyncio.gather(*tasks)
+    log.info("Hub subsystems started", **{name: entry["state"] for name, entry in readiness.subsystems.items()})
+
+async def save_analytics():
+    """Persist the stats periodically; they are served from memory."""
+    while True:
+        await asyncio.sleep(SAVE_INTERVAL)
+        await asyncio.to_thread(analytics.save)
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    GPIO.cleanup()
+    if hardware is not None:
+        hardware.stop()
+    elif buzzer is not None:
+        buzzer.cleanup()
+    save_state()
+    snapshots.close()
+    if readiness.subsystems.get("analytics", {}).get("state") == "up":
+        analytics.save()  # not over a file that was never loaded
+    journal.close()
 
 # Test APIs for frontend
 @app.get("/api/setbuzzer")
 async def set_buzzer_status():
     global buzzer_clicked
     buzzer_clicked = True
+    round_timer.start()
 
 @app.get("/api/setstatus")
 async def set_statuses():
@@ -340,37 +690,134 @@ async def set_statuses():
     statuses["stl2"]="correct"
     statuses["stl3"]="correct"
     statuses["stl4"]="correct"
+    round_timer.finish()
+
+# -----------------------
+# Answer sets
+# -----------------------
+class RoundSelect(BaseModel):
+    round: str
+
+async def push_answers_to_satellite(name: str, config: dict):
+    url = satellite_url(name, "/api/answers")
+    try:
+        async with satellite_client(2.0) as client:
+            response = await client.post(url, json=config)
+            response.raise_for_status()
+            count_satellite_call(name, "answers")
+            log.info("Answers pushed", satellite=name, version=config["version"])
+            return True
+    except Exception as e:
+        count_satellite_call(name, "answers", e)
+        log.warning("Satellite call failed", satellite=name, endpoint="answers", error=str(e))
+        return False
+
+async def sync_answers(name: str, version) -> None:
+    """Re-push the answers to a satellite whose /status reports an older version."""
+    if isinstance(version, int) and version < answers.config.version:
+        log.info("Satellite answers behind, pushing", satellite=name, version=version,
+                 hub_version=answers.config.version)
+        await push_answers_to_satellite(name, answers.config.to_dict())
+
+async def distribute_answers():
+    config = answers.config.to_dict()
+    results = await asyncio.gather(*(push_answers_to_satellite(name, config) for name in SATELLITES))
+    return dict(zip(SATELLITES, results))
+
+@app.get("/api/answers")
+async def get_answers():
+    return answers.config.to_dict()
+
+@app.post("/api/answers")
+async def set_answers(config: dict):
+    try:
+        # The hub numbers its configs, whatever version the client sent
+        answers.load(config, bump_version=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid answer config: {e}")
+    except OSError as e:
+        log.error("Failed to save answers", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Could not save answer config: {e}")
+    return {"version": answers.config.version, "satellites": await distribute_answers()}
+
+@app.post("/api/answers/round")
+async def select_round(selection: RoundSelect):
+    try:
+        answers.select_round(selection.round)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OSError as e:
+        log.error("Failed to save answers", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Could not save answer config: {e}")
+    return {"version": answers.config.version, "round": answers.config.round,
+            "satellites": await distribute_answers()}
+
+class IdleStart(BaseModel):
+    timeline: Optional[dict] = None  # see animation.py; default is the classic show
 
 # API endpoints
 @app.post("/api/idle-start")
-async def idle_start():
-    print("[IDLE] Server is starting the idle mode")
+async def idle_start(request: Optional[IdleStart] = None):
+    global idle_state
+    log.info("Starting idle mode")
+    # One timeline for every station, so offsets can address all of them
+    timeline = request.timeline if request and request.timeline else classic_timeline(["local", *SATELLITES])
+    try:
+        Timeline(timeline, "local")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     ts=time.time()
-    led.start_idle_mode(ts)
-    for sat in ["stl1", "stl2", "stl3", "stl4"]:
-        url = f"http://{sat}.local:8080/api/idle-start"
+    led.start_idle_mode(ts, timeline)
+    idle_state = {"start": ts, "timeline": timeline}
+    save_state()
+    for sat in SATELLITES:
+        url = satellite_url(sat, "/api/idle-start")
         try:
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                await client.post(url, json={"timestamp": ts})
-                print(f"[HUB] Idle mode started on {sat} with timestamp {ts}")
+            async with satellite_client(2.0) as client:
+                await client.post(url, json={"timestamp": clocks.to_peer_wall(sat, ts),
+                                               "timeline": timeline})
+                count_satellite_call(sat, "idle-start")
+                log.info("Idle mode started", satellite=sat, timestamp=ts)
         except Exception as e:
-            print(f"[HUB] Failed to start idle on {sat}: {e}")
+            count_satellite_call(sat, "idle-start", e)
+            log.warning("Satellite call failed", satellite=sat, endpoint="idle-start", error=str(e))
     return {"status": "idle_started"}
 
 @app.post("/api/idle-stop")
 async def idle_stop():
-    print("[IDLE] Server is stopping the idle mode")
+    global idle_state
+    log.info("Stopping idle mode")
     led.stop_idle_mode()
-    for sat in ["stl1", "stl2", "stl3", "stl4"]:
-        url = f"http://{sat}.local:8080/api/idle-stop"
+    idle_state = None
+    save_state()
+    for sat in SATELLITES:
+        url = satellite_url(sat, "/api/idle-stop")
         try:
-            async with httpx.AsyncClient(timeout=2.0) as client:
+            async with satellite_client(2.0) as client:
                 await client.post(url)
-                print(f"[HUB] Idle mode stopped on {sat}")
+                count_satellite_call(sat, "idle-stop")
+                log.info("Idle mode stopped", satellite=sat)
         except Exception as e:
-            print(f"[HUB] Failed to stop idle on {sat}: {e}")
+            count_satellite_call(sat, "idle-stop", e)
+            log.warning("Satellite call failed", satellite=sat, endpoint="idle-stop", error=str(e))
     return {"status": "idle_stopped"}
 
+@app.get("/api/traces")
+async def get_traces():
+    """Tap -> LED latency histograms per station and stage."""
+    return trace_stats.snapshot()
+
+@app.get("/api/clocks")
+async def get_clocks():
+    """Estimated clock offset and probe RTT per satellite."""
+    return clocks.snapshot()
+
+@app.get("/api/stats")
+async def get_stats():
+    """Live game statistics for the operator screen."""
+    return analytics.snapshot()
+
 @app.get("/api/statuses")
 async def get_statuses():
     return statuses
@@ -379,22 +826,32 @@ async def get_statuses():
 async def get_buzzer_status():
     global buzzer_clicked
     state = buzzer_clicked
-    print(f"[API] /api/buzzer called -> buzzer_clicked={state}")
+    log.debug("Buzzer state read", clicked=state)
     if buzzer_clicked:
         buzzer_clicked = False  # reset flag immediately
-        print("[API] buzzer_clicked reset to False after read")
+        log.debug("Buzzer flag reset after read")
     return {"clicked": state}
 
+@app.get("/api/round")
+async def get_round():
+    """Current round as timed by the hub; the kiosk shows it and saves it by name."""
+    return round_timer.snapshot()
+
 @app.post("/api/save")
-async def save_user(user: UserSave):
+async def save_user(user: ScoreSave):
+    duration = round_timer.claim()
+    if duration is None:
+        raise HTTPException(status_code=409, detail="Keine beendete Runde zum Speichern")
+    save_state()
+    time_text = format_duration(duration)
     with db.get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO users (name, time) VALUES (?, ?)",
-            (user.name, user.time)
+            (user.name, time_text)
         )
         conn.commit()
-        return {"message": "User saved successfully", "userId": cursor.lastrowid}
+        return {"message": "User saved successfully", "userId": cursor.lastrowid, "time": time_text}
 
 @app.get("/api/leaderboard")
 async def get_leaderboard():
@@ -516,8 +973,10 @@ async def get_all_users():
 
 # Frontend serve after apis
 dist_path = os.path.join(os.path.dirname(__file__), 'dist')
-app.mount("/", StaticFiles(directory=dist_path, html=True), name="frontend")
+app.mount("/", PrecompressedStaticFiles(directory=dist_path, html=True), name="frontend")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
+    # One worker: the game state is module globals (see hw_process.py)
+    uvicorn.run(app, host="0.0.0.0", port=8080, loop=UVICORN_LOOP, http=UVICORN_HTTP,
+                backlog=UVICORN_BACKLOG, timeout_keep_alive=UVICORN_KEEP_ALIVE)
\ No newline at end of file
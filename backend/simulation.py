@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Simulation mode of the hub, for frontend development and soak tests.
+
+Serves the real hub (server.app, UI and API on port 8080) with simulated
+hardware and in-process satellites, and plays complete rounds like visitors
+at the fair: buzzer press, cards tapped at the local reader and the
+satellites over time (some wrong ones first), the win, a score saved under
+a name, and the hub's reset. The rounds run on a virtual clock that --speed
+accelerates; round times, the hub's pause after a win and the saved scores
+are in virtual time, so the leaderboards fill with plausible entries.
+
+    cd backend
+    python simulation.py                              # real time, endless
+    python simulation.py --speed 50 --rounds 2000 --out sim.json
+    python simulation.py --manual                     # no scripted rounds, drive the hub from the UI
+    npm run dev                                       # vite on :5174 against the simulation
+
+A progress line with the hub's memory use is printed every --report rounds,
+so leaks show up long before the fair. The database is a temporary one
+unless MESSE_DB_PATH is set.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+
+# Must be set before the hub is imported
+os.environ.setdefault("MESSE_HARDWARE", "sim")
+os.environ.setdefault("MESSE_LOG_LEVEL", "WARNING")
+os.environ.setdefault("MESSE_JOURNAL", "")
+os.environ.setdefault("MESSE_STATE_PATH", "")
+os.environ.setdefault("MESSE_STATS_PATH", "")
+os.environ.setdefault("MESSE_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="messe-sim-"), "sim.sqlite"))
+# Reader and buzzer are driven from this process
+os.environ["MESSE_HW_PROCESS"] = "0"
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+import nfc_reader  # noqa: E402
+import server  # noqa: E402
+
+WRONG_ID = "1"
+WAIT_TIMEOUT = 10.0  # real seconds the hub gets to react to a step
+POLL = 0.01          # real seconds between checks while waiting for the hub
+TAP_GAP = 0.05       # real seconds at least between two cards at the local reader
+
+
+class VirtualClock:
+    """Time that runs speed times faster than the wall clock."""
+
+    def __init__(self, speed: float):
+        self.speed = speed
+        self.started = time.monotonic()
+
+    def now(self) -> float:
+        """Virtual seconds since the clock was created."""
+        return (time.monotonic() - self.started) * self.speed
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds / self.speed)
+
+
+class Satellites:
+    """Answers the hub's calls to the satellites in-process."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if request.url.path == "/api/clock":
+            return httpx.Response(200, json={"wall": time.time(), "mono": time.monotonic()})
+        return httpx.Response(200, json={"message": "ok", "trace": None})
+
+
+async def until(condition, what: str) -> None:
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not condition():
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Hub did not {what} within {WAIT_TIMEOUT:.0f}s")
+        await asyncio.sleep(POLL)
+
+
+def rss_mb() -> float:
+    """Resident memory of this process (hub and simulation) in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except OSError:
+        # Peak instead of current, where /proc is not available (kB on Linux, bytes on macOS)
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+class Simulation:
+    def __init__(self, args):
+        self.args = args
+        self.clock = VirtualClock(args.speed)
+        self.rng = random.Random(args.seed)
+        self.satellites = Satellites()
+        self.hub = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://hub")
+        self.durations_ms = []
+        self.saved = 0
+        self.shed = 0
+
+        if args.satellites:
+            server.SATELLITES[:] = args.satellites.split(",")
+            server.statuses.clear()
+            server.statuses.update({"local": None, **{name: None for name in server.SATELLITES}})
+        server.satellite_transport = httpx.MockTransport(self.satellites.handle)
+        # The hub's clocks run at the simulation's speed
+        server.round_timer.speed = args.speed
+        server.WIN_PAUSE /= args.speed
+
+    async def think(self, low: float, high: float) -> None:
+        await self.clock.sleep(self.rng.uniform(low, high))
+
+    # ----------------------
+    # Stations
+    # ----------------------
+    def cards(self, solution: list[str]) -> list[str]:
+        """What a visitor taps: a few wrong cards now and then, then the solution."""
+        wrong = self.rng.choices([0, 1, 2], weights=[5, 3, 1])[0]
+        return [WRONG_ID] * wrong + solution
+
+    async def play_local(self) -> None:
+        reader = nfc_reader.get_reader()
+        for uid in self.cards(server.answers.solution("local")):
+            await self.think(3, 20)
+            reader.present(uid)
+            await until(lambda: str(server.nfc_state.get_reading().get("id")) == uid, "read the local card")
+            await asyncio.sleep(TAP_GAP)
+
+    async def play_satellite(self, name: str) -> None:
+        # Cards from the answer config. A station it does not cover checks the sat_config.CORRECT_ID
+        # on its Pi, unknown to the hub; the hub's CORRECT_ID stands in, only the statuses reach the hub
+        cards = self.cards(server.answers.solution(name) or [server.CORRECT_ID])
+        for index, card in enumerate(cards):
+            await self.think(3, 20)
+            if card == WRONG_ID:
+                status = "wrong"
+            else:
+                status = "correct" if index == len(cards) - 1 else "partial"
+            # Each tap its own id, as a card taken off and put back is a new read
+            await self.post_status(name, status, f"{card}-{index}")
+
+    async def post_status(self, name: str, status: str, card: str) -> None:
+        while True:
+            response = await self.hub.post("/api/remote", json={"satellite": name, "id": card, "status": status})
+            if response.status_code != 429:
+                response.raise_for_status()
+                return
+            self.shed += 1
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+    # ----------------------
+    # Rounds
+    # ----------------------
+    async def play_round(self, number: int) -> None:
+        await self.think(5, 20)  # the next visitor walks up
+        server.buzzer.press()
+        await until(lambda: server.game_active, "start the round")
+        server.buzzer.release()
+
+        await asyncio.gather(self.play_local(), *(self.play_satellite(name) for name in server.SATELLITES))
+        await until(lambda: server.round_timer.duration_ms() is not None, "finish the round")
+        self.durations_ms.append(server.round_timer.duration_ms())
+
+        if not self.args.no_save:
+            await self.think(5, 15)  # typing the name
+            response = await self.hub.post("/api/save", json={"name": f"Sim {number}"})
+            # 409: the round was already saved from the UI
+            if response.status_code != 409:
+                response.raise_for_status()
+                self.saved += 1
+        await until(lambda: not server.game_active, "reset after the win")
+        nfc_reader.get_reader().remove()
+
+    async def run(self) -> dict:
+        await until(lambda: server.buzzer is not None and nfc_reader.reader is not None, "set up reader and buzzer")
+        started = time.monotonic()
+        rss_start = rss_mb()
+        number = 0
+        while not self.args.rounds or number < self.args.rounds:
+            number += 1
+            await self.play_round(number)
+            if number % self.args.report == 0:
+                elapsed = time.monotonic() - started
+                print(f"{number} rounds, {number / elapsed * 60:.1f} rounds/min, {rss_mb()} MB", flush=True)
+        elapsed = time.monotonic() - started
+        ordered = sorted(self.durations_ms)
+        return {
+            "speed": self.args.speed,
+            "rounds": number,
+            "real_s": round(elapsed, 1),
+            "virtual_s": round(elapsed * self.args.speed, 1),
+            "rounds_per_min": round(number / elapsed * 60, 1),
+            "round_ms": {"p50": ordered[len(ordered) // 2], "max": ordered[-1]} if ordered else {},
+            "saved": self.saved,
+            "shed": self.shed,
+            "satellite_calls": self.satellites.calls,
+            "rss_mb": {"start": rss_start, "end": rss_mb()},
+        }
+
+
+async def main(args) -> dict | None:
+    simulation = Simulation(args)
+    hub = uvicorn.Server(uvicorn.Config(server.app, host=args.host, port=args.port, log_level="warning"))
+    serving = asyncio.create_task(hub.serve())
+    await until(lambda: hub.started or serving.done(), "start serving")
+    if serving.done():
+        serving.result()  # e.g. port in use
+        return None
+    print(f"Hub simulation on http://localhost:{args.port}, speed {args.speed:g}x, database {server.db.db_path}",
+          flush=True)
+    if args.manual:
+        await serving
+        return None
+    rounds = asyncio.create_task(simulation.run())
+    # Ctrl+C stops the hub (uvicorn handles the signal) and with it the rounds
+    await asyncio.wait({serving, rounds}, return_when=asyncio.FIRST_COMPLETED)
+    if not rounds.done():
+        rounds.cancel()
+        return None
+    hub.should_exit = True
+    await serving
+    return rounds.result()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hub simulation with scripted rounds on a virtual clock")
+    parser.add_argument("--speed", type=float, default=1.0, help="time factor, e.g. 10 to 100")
+    parser.add_argument("--rounds", type=int, default=0, help="stop after this many rounds (default: endless)")
+    parser.add_argument("--satellites", help="comma separated satellite names (default: hub config)")
+    parser.add_argument("--manual", action="store_true", help="serve the hub without scripted rounds")
+    parser.add_argument("--no-save", action="store_true", help="do not save a score after each round")
+    parser.add_argument("--report", type=int, default=100, help="log progress every N rounds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--out", help="write the summary as JSON here")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    try:
+        summary = asyncio.run(main(args))
+    except KeyboardInterrupt:
+        summary = None
+    if summary is not None:
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(summary, f, indent=2)
+        print(json.dumps(summary, indent=2))
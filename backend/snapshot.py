@@ -0,0 +1,108 @@
+"""
+Crash-safe snapshots of the hub's game state.
+
+The hub hands its compact state (round, statuses, game_active, idle mode,
+satellite health) to save() whenever it changes; a background thread writes
+the latest version atomically (temp file, fsync, rename), skipping repeats.
+After a crash the restarted hub restores it and resynchronises the
+satellites instead of the whole installation being rebooted.
+
+MESSE_STATE_PATH  snapshot file (default backend/hub_state.json, empty to disable)
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STATE_PATH = os.environ.get("MESSE_STATE_PATH", os.path.join(os.path.dirname(__file__), "hub_state.json"))
+
+VERSION = 1
+
+
+def boot_id() -> str | None:
+    """Identifies the current boot; monotonic timestamps are only comparable within one."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def write_atomic(path: str, data: str) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Snapshotter:
+    def __init__(self, path: str | None):
+        self.path = path or None
+        self.pending = None
+        self.last = None
+        self.writes = 0
+        self.closing = False
+        self.changed = threading.Condition()
+        self.thread = None
+        if self.path:
+            self.thread = threading.Thread(target=self._write_loop, name="snapshot", daemon=True)
+            self.thread.start()
+
+    def save(self, state: dict) -> None:
+        """Queue state for writing; only the newest queued state is written."""
+        if self.path is None:
+            return
+        with self.changed:
+            self.pending = state
+            self.changed.notify()
+
+    def load(self) -> dict | None:
+        """The last snapshot, or None if there is none or it is unusable."""
+        if self.path is None:
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable state snapshot: {e}")
+            return None
+        if snapshot.get("version") != VERSION:
+            logger.warning(f"Ignoring state snapshot version {snapshot.get('version')}")
+            return None
+        snapshot["same_boot"] = snapshot.get("boot_id") is not None and snapshot.get("boot_id") == boot_id()
+        return snapshot
+
+    def close(self) -> None:
+        """Write what is pending and stop the writer."""
+        if self.thread is not None:
+            with self.changed:
+                self.closing = True
+                self.changed.notify()
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def _write_loop(self) -> None:
+        boot = boot_id()
+        while True:
+            with self.changed:
+                while self.pending is None and not self.closing:
+                    self.changed.wait()
+                state, self.pending = self.pending, None
+                closing = self.closing
+            if state is not None and state != self.last:
+                snapshot = {"version": VERSION, "boot_id": boot, "saved_at": time.time(), **state}
+                try:
+                    write_atomic(self.path, json.dumps(snapshot, separators=(",", ":")))
+                    self.last = state
+                    self.writes += 1
+                except (OSError, TypeError, ValueError) as e:
+                    logger.error(f"State snapshot failed: {e}")
+            if closing:
+                return
@@ -0,0 +1,77 @@
+"""
+Static serving of the built frontend.
+
+StaticFiles plus:
+  - build-time precompressed variants (file.br, file.gz from precompress.py),
+    chosen by Accept-Encoding, so the hub never compresses per request
+  - Cache-Control: hashed Vite assets are immutable for a year, everything
+    else (index.html) is revalidated with its ETag on each load
+ETag / Last-Modified and the 304 handling come from Starlette; every encoded
+variant has its own ETag because it is a separate file.
+"""
+import mimetypes
+import os
+import re
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+# Vite names bundled assets like index-BXpy5uE_.js
+HASHED_ASSET = re.compile(r"-[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Codings from an Accept-Encoding header, without the ones refused with q=0."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        name = os.path.basename(full_path)
+        headers = {
+            "Cache-Control": IMMUTABLE if HASHED_ASSET.search(name) else REVALIDATE,
+            "Vary": "Accept-Encoding",
+        }
+
+        response = None
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        for coding, suffix in ENCODINGS:
+            if coding not in accepted:
+                continue
+            try:
+                encoded_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            # Served with the media type of the original file
+            response = FileResponse(full_path + suffix, status_code=status_code, stat_result=encoded_stat,
+                                    media_type=mimetypes.guess_type(name)[0] or "text/plain",
+                                    headers={**headers, "Content-Encoding": coding})
+            break
+
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result,
+                                    headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
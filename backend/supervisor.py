@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Brings up the installation: satellites in parallel, then the hub.
+
+Every satellite is probed over SSH, optionally deployed to (rsync of the
+backend's .py files, without its sat_config.py), started and then polled on
+its /status endpoint until it answers. Nodes are handled concurrently, so
+startup takes as long as the slowest node; a node that fails a step is
+retried on its own without touching the others. Per-node timings are
+printed (and written with --out) once everything is up.
+
+    cd backend
+    python supervisor.py                 # start satellites and hub (startup)
+    python supervisor.py --watch         # ... and keep them running (autorun)
+    python supervisor.py --deploy --satellites stl1,stl2 --no-hub
+
+With --watch a crashed hub is restarted on its own (it restores its state,
+see snapshot.py) and satellites that stop answering /status are restarted
+individually. Ctrl+C / SIGTERM stops the hub and reboots the satellites,
+like the old shell scripts.
+
+MESSE_SSH_USER, MESSE_SSH_PASSWORD, MESSE_REMOTE_PATH  satellite access
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+
+import httpx
+
+import jsonlog
+
+jsonlog.setup_logging()
+log = jsonlog.get_logger("supervisor")
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SATELLITES = ["stl1", "stl2", "stl3", "stl4"]
+SSH_USER = os.environ.get("MESSE_SSH_USER", "oleg77")
+SSH_PASSWORD = os.environ.get("MESSE_SSH_PASSWORD", "1234")
+REMOTE_PATH = os.environ.get("MESSE_REMOTE_PATH", "~/Documents/messe-ui/backend")
+PORT = 8080
+
+SSH_TIMEOUT = 15.0      # seconds per SSH command
+PROBE_RETRIES = 5       # SSH reachability, with exponential backoff
+ATTEMPTS = 3            # probe/deploy/start/ready cycles per node before giving up
+READY_TIMEOUT = 60.0    # until /status answers after starting
+READY_POLL = 0.25
+WATCH_INTERVAL = 5.0
+WATCH_FAILURES = 3      # missed /status checks before a satellite is restarted
+HUB_RESTART_DELAY = 2.0
+
+SSH_OPTIONS = ["-o", "StrictHostKeyChecking=no", "-o", "ConnectTimeout=5"]
+
+
+def host(name: str) -> str:
+    return f"{name}.local"
+
+
+def ssh_command(name: str, command: str) -> list[str]:
+    return ["sshpass", "-p", SSH_PASSWORD, "ssh", *SSH_OPTIONS, f"{SSH_USER}@{host(name)}", command]
+
+
+async def run(args: list[str], timeout: float = SSH_TIMEOUT) -> str:
+    """Run a command; raises RuntimeError with its output if it fails."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *args, stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+    except OSError as e:  # e.g. sshpass not installed
+        raise RuntimeError(str(e))
+    try:
+        output, _ = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise RuntimeError(f"timed out after {timeout:.0f}s")
+    if process.returncode != 0:
+        raise RuntimeError(f"exit {process.returncode}: {output.decode(errors='replace').strip()[-200:]}")
+    return output.decode(errors="replace")
+
+
+class Node:
+    """One satellite and the timings of its last bring-up."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = "pending"
+        self.attempts = 0
+        self.timings = {}  # step -> seconds
+        self.error = None
+        self.failures = 0  # consecutive missed /status checks while watching
+
+    async def step(self, step: str, coroutine):
+        started = time.monotonic()
+        self.state = step
+        try:
+            return await coroutine
+        finally:
+            self.timings[step] = round(time.monotonic() - started, 3)
+
+    async def probe(self) -> None:
+        wait = 1.0
+        for retry in range(PROBE_RETRIES + 1):
+            try:
+                await run(ssh_command(self.name, "echo OK"))
+                return
+            except RuntimeError as e:
+                if retry == PROBE_RETRIES:
+                    raise RuntimeError(f"unreachable: {e}")
+                log.info("Satellite unreachable, retrying", satellite=self.name, wait_s=wait)
+                await asyncio.sleep(wait)
+                wait *= 2
+
+    async def deploy(self) -> None:
+        # sat_config.py holds the satellite's own ID and stays as it is
+        shell = " ".join(["sshpass", "-p", SSH_PASSWORD, "ssh", *SSH_OPTIONS])
+        await run(["rsync", "-az", "-e", shell,
+                   "--exclude", "sat_config.py", "--include", "*.py", "--include", "requirements",
+                   "--exclude", "*", f"{BACKEND_DIR}/", f"{SSH_USER}@{host(self.name)}:{REMOTE_PATH}/"],
+                  timeout=60.0)
+
+    async def start(self) -> None:
+        # Only the satellite app is stopped, not every python3 on the node. The name is in a
+        # variable so the pattern does not match the shells running this line as well.
+        # A login shell, like the old startup script, so the venv and PATH are set up.
+        await run(ssh_command(self.name, (
+            "bash -lc '"
+            f'app=satellite.py; pkill -f "python3 $app"; cd {REMOTE_PATH} && source .venv/bin/activate && '
+            "MESSE_LOG_FILE=satellite.jsonl nohup python3 $app > satellite.log 2>&1 < /dev/null &'")))
+
+    async def wait_ready(self, client: httpx.AsyncClient) -> None:
+        deadline = time.monotonic() + READY_TIMEOUT
+        while True:
+            try:
+                response = await client.get(f"http://{host(self.name)}:{PORT}/status")
+                if response.status_code == 200 and response.json().get("status") == "running":
+                    return
+            except (httpx.HTTPError, ValueError):
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"/status not ready after {READY_TIMEOUT:.0f}s")
+            await asyncio.sleep(READY_POLL)
+
+    async def bring_up(self, client: httpx.AsyncClient, deploy: bool = False) -> bool:
+        """Probe, deploy, start and wait for the node; retries only this node."""
+        started = time.monotonic()
+        self.timings = {}
+        for attempt in range(1, ATTEMPTS + 1):
+            self.attempts = attempt
+            try:
+                await self.step("probe", self.probe())
+                if deploy:
+                    await self.step("deploy", self.deploy())
+                await self.step("start", self.start())
+                await self.step("ready", self.wait_ready(client))
+            except RuntimeError as e:
+                self.error = f"{self.state}: {e}"
+                log.warning("Satellite failed", satellite=self.name, step=self.state,
+                            attempt=attempt, error=str(e))
+                continue
+            self.state = "up"
+            self.error = None
+            self.failures = 0
+            self.timings["total"] = round(time.monotonic() - started, 3)
+            log.info("Satellite up", satellite=self.name, attempt=attempt, **self.timings)
+            return True
+        self.state = "failed"
+        self.timings["total"] = round(time.monotonic() - started, 3)
+        return False
+
+    async def reboot(self) -> None:
+        try:
+            await run(ssh_command(self.name, "sudo reboot"), timeout=5.0)
+        except RuntimeError:
+            pass  # the connection usually drops while rebooting
+
+    def report(self) -> dict:
+        return {"state": self.state, "attempts": self.attempts, "timings": self.timings, "error": self.error}
+
+
+class Supervisor:
+    def __init__(self, names: list[str], deploy: bool = False):
+        self.nodes = {name: Node(name) for name in names}
+        self.deploy = deploy
+        self.hub = None
+        self.hub_restarts = 0
+        self.stopping = asyncio.Event()
+        self.restarting = set()  # satellite restart tasks while watching
+        self.client = httpx.AsyncClient(timeout=2.0)
+
+    async def start_satellites(self) -> dict:
+        started = time.monotonic()
+        await asyncio.gather(*(node.bring_up(self.client, self.deploy) for node in self.nodes.values()))
+        return {
+            "total_s": round(time.monotonic() - started, 3),
+            "satellites": {name: node.report() for name, node in self.nodes.items()},
+        }
+
+    async def start_hub(self) -> float:
+        """Start server.py and wait until /ready says it is; returns the seconds it took.
+
+        A hub that exits before it is ready is started again, up to ATTEMPTS
+        times in all; then RuntimeError is raised.
+        """
+        started = time.monotonic()
+        for attempt in range(1, ATTEMPTS + 1):
+            self.hub = await asyncio.create_subprocess_exec(sys.executable, "server.py", cwd=BACKEND_DIR)
+            ready = {}
+            while self.hub.returncode is None:
+                try:
+                    response = await self.client.get(f"http://localhost:{PORT}/ready")
+                    ready = response.json()
+                    if response.status_code == 200:
+                        break
+                except (httpx.HTTPError, ValueError):
+                    pass
+                await asyncio.sleep(READY_POLL)
+            if self.hub.returncode is None:
+                elapsed = round(time.monotonic() - started, 3)
+                failed = [name for name, entry in ready.get("subsystems", {}).items() if entry["state"] == "failed"]
+                log.info("Hub up", pid=self.hub.pid, seconds=elapsed, degraded=failed or None)
+                return elapsed
+            log.error("Hub exited before it was ready", code=self.hub.returncode, attempt=attempt)
+            if attempt < ATTEMPTS:
+                await asyncio.sleep(HUB_RESTART_DELAY)
+        raise RuntimeError(f"hub exited before it was ready ({ATTEMPTS} attempts)")
+
+    async def watch_hub(self) -> None:
+        while not self.stopping.is_set():
+            code = await self.hub.wait()
+            if self.stopping.is_set():
+                return
+            self.hub_restarts += 1
+            log.error("Hub exited, restarting", code=code, restarts=self.hub_restarts)
+            await asyncio.sleep(HUB_RESTART_DELAY)
+            try:
+                await self.start_hub()
+            except RuntimeError as e:
+                # The dead process ends the next wait() right away, so it is tried again
+                log.error("Hub failed to start", error=str(e))
+
+    async def watch_satellites(self) -> None:
+        while not self.stopping.is_set():
+            await asyncio.sleep(WATCH_INTERVAL)
+            await asyncio.gather(*(self.check(node) for node in self.nodes.values() if node.state in ("up", "failed")))
+
+    async def check(self, node: Node) -> None:
+        try:
+            response = await self.client.get(f"http://{host(node.name)}:{PORT}/status")
+            response.raise_for_status()
+            node.failures = 0
+            return
+        except httpx.HTTPError:
+            node.failures += 1
+        if node.failures >= WATCH_FAILURES:
+            # In its own task, so the other satellites are still checked meanwhile
+            log.warning("Satellite not answering, restarting it", satellite=node.name)
+            node.state = "restarting"
+            task = asyncio.create_task(node.bring_up(self.client))
+            self.restarting.add(task)
+            task.add_done_callback(self.restarting.discard)
+
+    async def stop(self, reboot: bool) -> None:
+        self.stopping.set()
+        for task in list(self.restarting):
+            task.cancel()
+        if self.hub is not None and self.hub.returncode is None:
+            self.hub.terminate()
+            try:
+                await asyncio.wait_for(self.hub.wait(), 10)
+            except asyncio.TimeoutError:
+                self.hub.kill()
+        if reboot:
+            log.info("Rebooting satellites")
+            await asyncio.gather(*(node.reboot() for node in self.nodes.values()))
+        await self.client.aclose()
+
+
+def print_report(report: dict) -> None:
+    print(f"{'satellite':<10} {'state':<8} {'try':>3} {'probe':>7} {'deploy':>7} {'start':>7} {'ready':>7} {'total':>7}")
+    for name, node in report["satellites"].items():
+        t = node["timings"]
+        cells = "".join(f" {t[step]:>7.2f}" if step in t else f" {'-':>7}"
+                        for step in ("probe", "deploy", "start", "ready", "total"))
+        print(f"{name:<10} {node['state']:<8} {node['attempts']:>3}{cells}")
+        if node["error"]:
+            print(f"{'':<10} {node['error']}")
+    print(f"satellites done in {report['total_s']:.2f}s", end="")
+    print(f", hub in {report['hub_s']:.2f}s" if "hub_s" in report else "")
+
+
+async def main(args) -> int:
+    supervisor = Supervisor(args.satellites.split(","), deploy=args.deploy)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, supervisor.stopping.set)
+
+    # Ctrl+C during startup stops right away
+    starting = asyncio.create_task(supervisor.start_satellites())
+    stopping = asyncio.create_task(supervisor.stopping.wait())
+    await asyncio.wait([starting, stopping], return_when=asyncio.FIRST_COMPLETED)
+    if stopping.done():
+        starting.cancel()
+        await supervisor.stop(reboot=not args.no_reboot)
+        return 1
+
+    report = starting.result()
+    if not args.no_hub:
+        try:
+            report["hub_s"] = await supervisor.start_hub()
+        except RuntimeError as e:
+            log.error("Hub failed to start", error=str(e))
+            await supervisor.stop(reboot=False)
+            return 1
+    print_report(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = any(node["state"] != "up" for node in report["satellites"].values())
+    if args.no_hub:
+        await supervisor.stop(reboot=False)
+        return 1 if failed else 0
+
+    tasks = [asyncio.create_task(supervisor.watch_hub()), asyncio.create_task(supervisor.watch_satellites())] \
+        if args.watch else [asyncio.create_task(supervisor.hub.wait())]
+    await asyncio.wait([stopping, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    for task in tasks:
+        task.cancel()
+    await supervisor.stop(reboot=stopping.done() and not args.no_reboot)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start satellites in parallel and run the hub")
+    parser.add_argument("--satellites", default=",".join(SATELLITES), help="comma separated satellite names")
+    parser.add_argument("--deploy", action="store_true", help="rsync the backend to the satellites first")
+    parser.add_argument("--watch", action="store_true", help="restart a crashed hub and unresponsive satellites")
+    parser.add_argument("--no-hub", action="store_true", help="only bring up the satellites")
+    parser.add_argument("--no-reboot", action="store_true", help="leave the satellites running on Ctrl+C")
+    parser.add_argument("--out", help="write the startup timings as JSON here")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,163 @@
+"""
+Tap -> LED latency tracing.
+
+A trace starts when a card is detected on a reader and ends when that
+station's LED has been set. Each hop adds monotonic timestamps (seconds) to
+the trace; the hub turns them into per-stage durations and keeps one
+histogram per station and stage.
+
+Stages (ms):
+    detect_to_send  card detected -> hub notified (reader's clock)
+    hub_queue       hub received -> evaluation started
+    hub_led_send    evaluation started -> LED request sent
+    led_rtt         LED request sent -> LED response received (hub's clock)
+    network         uplink + downlink, end_to_end minus the measured parts
+    uplink          reader sent -> hub received (needs the clock offset)
+    downlink        hub LED request sent -> LED applied (needs the clock offset)
+    end_to_end      card detected -> LED applied (reader's clock)
+"""
+import threading
+import time
+import uuid
+from collections import deque
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in milliseconds."""
+
+    def __init__(self, buckets=BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if ms <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (max for +Inf)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.sum / self.count if self.count else None,
+            "max_ms": self.max,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+        }
+
+
+class TraceAggregator:
+    def __init__(self, recent: int = 200):
+        self.histograms = {}  # station -> stage -> LatencyHistogram
+        self.recent = deque(maxlen=recent)
+        self.lock = threading.Lock()
+
+    def record(self, station: str, trace_id: str, stages: dict) -> None:
+        with self.lock:
+            per_station = self.histograms.setdefault(station, {})
+            for stage, ms in stages.items():
+                per_station.setdefault(stage, LatencyHistogram()).observe(ms)
+            self.recent.append({"station": station, "id": trace_id, "stages": stages})
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "stations": {
+                    station: {stage: hist.snapshot() for stage, hist in stages.items()}
+                    for station, stages in self.histograms.items()
+                },
+                "recent": list(self.recent),
+            }
+
+
+def _ms(start: float, end: float) -> float:
+    return round((end - start) * 1000, 3)
+
+
+def remote_stages(trace: dict, led_sent: float, led_acked: float, ack: dict,
+                  offset: float | None = None) -> dict:
+    """Stage durations for a satellite trace.
+
+    trace holds the reader's detected/sent and the hub's received/evaluated,
+    ack is the satellite's LED response trace with detected/led_applied.
+    offset is satellite minus hub monotonic clock (clocksync), if known.
+    """
+    stages = {
+        "detect_to_send": _ms(trace["detected"], trace["sent"]),
+        "hub_queue": _ms(trace["received"], trace["evaluated"]),
+        "hub_led_send": _ms(trace["evaluated"], led_sent),
+        "led_rtt": _ms(led_sent, led_acked),
+    }
+    if ack and ack.get("led_applied") is not None:
+        end_to_end = _ms(ack["detected"], ack["led_applied"])
+        stages["end_to_end"] = end_to_end
+        stages["network"] = round(end_to_end - stages["detect_to_send"]
+                                  - _ms(trace["received"], led_sent), 3)
+        if offset is not None:
+            stages["downlink"] = _ms(led_sent, ack["led_applied"] - offset)
+    if offset is not None:
+        stages["uplink"] = _ms(trace["sent"] - offset, trace["received"])
+    return stages
+
+
+def local_stages(trace: dict, led_applied: float) -> dict:
+    """Stage durations for the hub's own reader (one clock, no network)."""
+    return {
+        "detect_to_send": _ms(trace["detected"], trace["sent"]),
+        "hub_queue": _ms(trace["received"], trace["evaluated"]),
+        "end_to_end": _ms(trace["detected"], led_applied),
+    }
+
+
+class SentTraces:
+    """Reader-side memory of recent traces, so the LED handler can close them."""
+
+    def __init__(self, size: int = 32):
+        self.detected = {}
+        self.order = deque()
+        self.size = size
+        self.lock = threading.Lock()
+
+    def add(self, trace_id: str, detected: float) -> None:
+        with self.lock:
+            self.detected[trace_id] = detected
+            self.order.append(trace_id)
+            while len(self.order) > self.size:
+                self.detected.pop(self.order.popleft(), None)
+
+    def close(self, trace_id: str | None) -> dict | None:
+        """Return the ack for trace_id with the LED timestamp taken now."""
+        led_applied = time.monotonic()
+        if trace_id is None:
+            return None
+        with self.lock:
+            detected = self.detected.get(trace_id)
+        if detected is None:
+            return None
+        return {"id": trace_id, "detected": detected, "led_applied": led_applied}
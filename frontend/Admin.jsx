@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import './App.css';
 
 const Admin = () => {
@@ -11,36 +11,52 @@ const Admin = () => {
     const [editValue, setEditValue] = useState('');
     const [originalData, setOriginalData] = useState({});
     const [activeTable, setActiveTable] = useState('users'); // "users" or "all_scores"
+    // Filtering, sorting and paging happen on the server (/api/search)
+    const [filters, setFilters] = useState({
+        q: '', date_from: '', date_to: '', time_min: '', time_max: '', sort: 'time', order: 'asc'
+    });
+    const [nextCursor, setNextCursor] = useState(null);
+    const requestId = useRef(0);
 
     const correctPassword = "admin123"; // TODO: secure later
 
-    // Automatically reload data when switching tables
+    // Reload when switching tables or changing filters; typing is debounced
     useEffect(() => {
-        if (isAuthenticated) {
-            fetchTableData();
-        }
-    }, [activeTable]);
+        if (!isAuthenticated) return;
+        const timer = setTimeout(() => fetchTableData(), 250);
+        return () => clearTimeout(timer);
+    }, [activeTable, filters, isAuthenticated]);
 
     const handlePasswordSubmit = (e) => {
         e.preventDefault();
         if (password === correctPassword) {
             setIsAuthenticated(true);
-            fetchTableData();
         } else {
             setError('Incorrect password');
         }
     };
 
-    const fetchTableData = async () => {
-        const url = activeTable === 'users' ? '/api/getall' : '/api/leaderAll';
+    // Loads the first page, or appends the page after cursor
+    const fetchTableData = async (cursor = null) => {
+        const params = new URLSearchParams();
+        Object.entries(filters).forEach(([key, value]) => {
+            if (value) params.set(key, value);
+        });
+        if (cursor) params.set('cursor', cursor);
+        const id = ++requestId.current;
         try {
-            const response = await fetch(url);
-            if (!response.ok) throw new Error('Failed to fetch data');
+            const response = await fetch(`/api/search/${activeTable}?${params}`);
+            if (!response.ok) throw new Error((await response.json()).detail || 'Failed to fetch data');
             const data = await response.json();
-            setTableData(data);
+            if (id !== requestId.current) return; // a newer search is on its way
+
+            const rows = cursor ? [...tableData, ...data.rows] : data.rows;
+            setTableData(rows);
+            setNextCursor(data.next);
+            setError('');
 
             const origData = {};
-            data.forEach(row => {
+            rows.forEach(row => {
                 origData[row.id] = { ...row };
             });
             setOriginalData(origData);
@@ -49,6 +65,8 @@ const Admin = () => {
         }
     };
 
+    const setFilter = (key, value) => setFilters({ ...filters, [key]: value });
+
     const handleCheckboxChange = (id) => {
         const newSelected = new Set(selectedRows);
         if (newSelected.has(id)) newSelected.delete(id);
@@ -169,6 +187,46 @@ const Admin = () => {
                 </button>
             </div>
 
+            <div className="admin-filters">
+                <input
+                    type="search"
+                    value={filters.q}
+                    onChange={(e) => setFilter('q', e.target.value)}
+                    placeholder="Search name"
+                    autoFocus
+                />
+                <label>
+                    From <input type="date" value={filters.date_from}
+                                onChange={(e) => setFilter('date_from', e.target.value)}/>
+                </label>
+                <label>
+                    To <input type="date" value={filters.date_to}
+                              onChange={(e) => setFilter('date_to', e.target.value)}/>
+                </label>
+                <input
+                    type="text"
+                    value={filters.time_min}
+                    onChange={(e) => setFilter('time_min', e.target.value)}
+                    placeholder="Min time 00:01"
+                />
+                <input
+                    type="text"
+                    value={filters.time_max}
+                    onChange={(e) => setFilter('time_max', e.target.value)}
+                    placeholder="Max time 00:05"
+                />
+                <select value={filters.sort} onChange={(e) => setFilter('sort', e.target.value)}>
+                    <option value="time">Time</option>
+                    <option value="created_at">Created At</option>
+                    <option value="name">Name</option>
+                    <option value="id">ID</option>
+                </select>
+                <select value={filters.order} onChange={(e) => setFilter('order', e.target.value)}>
+                    <option value="asc">Ascending</option>
+                    <option value="desc">Descending</option>
+                </select>
+            </div>
+
             <div className="table-container">
                 <table>
                     <thead>
@@ -224,6 +282,11 @@ const Admin = () => {
                     ))}
                     </tbody>
                 </table>
+                {nextCursor && (
+                    <button onClick={() => fetchTableData(nextCursor)}>
+                        Load more
+                    </button>
+                )}
             </div>
 
             <div className="admin-controls">
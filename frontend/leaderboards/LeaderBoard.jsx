@@ -1,67 +1,22 @@
-import { useState, useEffect } from 'react';
+import { useState } from 'react';
 import './LeaderBoard.css';
 import '../App.css'
 import {useNavigate} from 'react-router-dom'
 import { useUser } from "../UserContext.jsx"; // <-- import context
 import {useIdleTimer} from "../useIdleTimer.jsx";
+import { useLeaderboard } from "./useLeaderboard.jsx";
 
 
 function LeaderBoard() {
     useIdleTimer()
-    const [leaders, setLeaders] = useState([]);
-    const [error, setError] = useState(null);
-    const [loading, setLoading] = useState(true);
+    // Loaded once, then kept current with delta updates
+    const { leaders, error, loading, refresh } = useLeaderboard("users");
+    const [resetError, setResetError] = useState(null);
     const [showAll, setShowAll] = useState(false);
     const navigate = useNavigate();
     const initialDisplayCount = 7;
     const { setName } = useUser();
 
-    useEffect(() => {
-        fetchLeaders();
-    }, []);
-
-    const fetchLeaders = async () => {
-    try {
-        console.log('Starting leaderboard fetch');
-        const response = await fetch('/api/leaderboard', {
-            headers: {
-                'Accept': 'application/json'
-            }
-        });
-        
-        console.log('Response status:', response.status);
-        console.log('Response headers:', Object.fromEntries(response.headers));
-        
-        const responseText = await response.text();
-        console.log('Raw response:', responseText);
-        
-        if (!responseText) {
-            console.log('Empty response received');
-            setLeaders([]);
-            return;
-        }
-        
-        try {
-            const data = JSON.parse(responseText);
-            console.log('Parsed data:', data);
-            
-            if (!response.ok) {
-                throw new Error(data.error || `HTTP error! status: ${response.status}`);
-            }
-            
-            setLeaders(Array.isArray(data) ? data : []);
-        } catch (e) {
-            console.error('JSON parse error:', e);
-            setError('Invalid server response format');
-        }
-    } catch (err) {
-        console.error('Fetch error:', err);
-        setError(`Failed to fetch leaderboard data: ${err.message}`);
-    } finally {
-        setLoading(false);
-    }
-};
-
     const handleReset = async () => {
         if (!window.confirm("Alle aktuellen User in All Scores verschieben und löschen?")) return;
 
@@ -74,15 +29,16 @@ function LeaderBoard() {
             const data = await response.json();
             console.log("Reset result:", data);
             // Refresh leaderboard after reset
-            fetchLeaders();
+            refresh();
         } catch (err) {
             console.error("Reset failed:", err);
-            setError(`Reset failed: ${err.message}`);
+            setResetError(`Reset failed: ${err.message}`);
         }
     };
 
     if (loading) return <div>Loading...</div>;
-    if (error) return <div>Error: {error}</div>;
+    if (resetError) return <div>Error: {resetError}</div>;
+    if (error && leaders.length === 0) return <div>Error: {error}</div>;
 
     const displayedLeaders = showAll ? leaders : leaders.slice(0, initialDisplayCount);
 
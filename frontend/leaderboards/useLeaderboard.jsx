@@ -0,0 +1,56 @@
+import { useState, useEffect, useRef, useCallback } from 'react';
+
+const REFRESH_MS = 5000;
+
+const byRank = (a, b) => (a.time < b.time ? -1 : a.time > b.time ? 1 : a.id - b.id);
+
+// Keeps a sorted leaderboard ("users" or "all_scores") in sync with the hub.
+// The board is loaded once; after that only the changes since the last
+// version are fetched (/api/leaderboard/<table>/changes?since=...).
+export function useLeaderboard(table) {
+    const [leaders, setLeaders] = useState([]);
+    const [error, setError] = useState(null);
+    const [loading, setLoading] = useState(true);
+    const version = useRef(null);
+    const rows = useRef(new Map());
+
+    const refresh = useCallback(async () => {
+        const since = version.current === null ? '' : `?since=${version.current}`;
+        try {
+            const response = await fetch(`/api/leaderboard/${table}/changes${since}`, {
+                headers: { 'Accept': 'application/json' }
+            });
+            const data = await response.json();
+            if (!response.ok) {
+                throw new Error(data.detail || `HTTP error! status: ${response.status}`);
+            }
+
+            if (data.full) {
+                rows.current = new Map(data.rows.map(row => [row.id, row]));
+            } else if (data.upserts.length === 0 && data.deletes.length === 0) {
+                version.current = data.version;
+                return;
+            } else {
+                data.deletes.forEach(id => rows.current.delete(id));
+                data.upserts.forEach(row => rows.current.set(row.id, row));
+            }
+            version.current = data.version;
+            setLeaders([...rows.current.values()].sort(byRank));
+            setError(null);
+        } catch (err) {
+            console.error('Leaderboard sync failed:', err);
+            setError(`Failed to fetch leaderboard data: ${err.message}`);
+        } finally {
+            setLoading(false);
+        }
+    }, [table]);
+
+    useEffect(() => {
+        version.current = null;
+        refresh();
+        const timer = setInterval(refresh, REFRESH_MS);
+        return () => clearInterval(timer);
+    }, [refresh]);
+
+    return { leaders, error, loading, refresh };
+}
@@ -1,4 +1,3 @@
-import { useStopwatch } from 'react-timer-hook';
 import { useNavigate } from 'react-router-dom';
 import "./Watches.css";
 import "../App.css";
@@ -13,13 +12,17 @@ function Stopwatch() {
     const { name } = useUser();
     const navigate = useNavigate();
     const [isVictoryAchieved, setIsVictoryAchieved] = useState(false);
+    // Elapsed time comes from the hub's round timer; locally it is only interpolated for display
+    const [elapsed, setElapsed] = useState(0);
+    const [finalTime, setFinalTime] = useState(null);
+    const baseRef = useRef(null);
     const [playVictory] = useSound(victorySound);
     const [playTicking, { stop: stopTicking }] = useSound(tickingSound, {
         interrupt: true,
         loop: true,
     });
 
-    // useRef to prevent multiple calls to handleClick
+    // useRef to prevent multiple calls to handleVictory
     const victoryTriggered = useRef(false);
 
     useEffect(() => {
@@ -27,36 +30,30 @@ function Stopwatch() {
         return () => stopTicking();
     }, [playTicking, stopTicking]);
 
-    const {
-        milliseconds,
-        seconds,
-        minutes,
-        pause,
-    } = useStopwatch({ autoStart: true, interval: 20 });
-
-    const formatTime = useCallback(({minutes, seconds, milliseconds}) => {
-        const pad = (num, size=2) => String(num).padStart(size, '0');
-        const ms = String(milliseconds).padStart(3, '0');
-        return `00:${pad(minutes)}:${pad(seconds)}.${ms}`;
-    }, []);
+    useEffect(() => {
+        if (finalTime !== null) return;
+        const interval = setInterval(() => {
+            if (baseRef.current !== null) setElapsed(performance.now() - baseRef.current);
+        }, 20);
+        return () => clearInterval(interval);
+    }, [finalTime]);
 
     const handleVictory = useCallback(async () => {
         if (victoryTriggered.current) return;
         victoryTriggered.current = true;
 
-        pause();
         stopTicking();
         playVictory();
         showConfetti();
 
-        const time = formatTime({minutes, seconds, milliseconds});
-        console.log("[FRONTEND] Saving time:", time);
+        // Only the name is sent, the hub stores the time it measured
+        console.log("[FRONTEND] Saving result for:", name);
 
         try {
             const response = await fetch("/api/save", {
                 method: "POST",
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ name, time })
+                body: JSON.stringify({ name })
             });
 
             if (!response.ok) {
@@ -74,65 +71,25 @@ function Stopwatch() {
         } catch (e) {
             console.error("[FRONTEND] Problem beim speichern: ", e);
         }
-    }, [formatTime, milliseconds, minutes, seconds, name, navigate, pause, playVictory, stopTicking]);
-
-    // Name und Zeit nach Backend schicken
-    async function handleClick() {
-        if (victoryTriggered.current) return; // prevent double trigger
-        victoryTriggered.current = true;
-
-        pause();
-        stopTicking();
-        playVictory();
-        showConfetti();
-
-        const time = formatTime({minutes, seconds, milliseconds});
-
-        try {
-            const response = await fetch("/api/save", {
-                method: "POST",
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ name, time })
-            });
-
-            if (!response.ok) {
-                const errorData = await response.text();
-                console.error('Server error:', errorData);
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-
-            const result = await response.json();
-            console.log('Save successful:', result);
-
-            setTimeout(() => {
-                navigate("/leaderboard");
-            }, 3000);
-
-        } catch (e) {
-            console.error("[FRONTEND] Problem beim speichern: ", e);
-        }
-    }
+    }, [name, navigate, playVictory, stopTicking]);
 
     useEffect(() => {
         const interval = setInterval(async () => {
             try {
-                const response = await fetch("/api/statuses");
-                if (!response.ok) throw new Error('Failed to fetch statuses');
-                const statuses = await response.json();
-
-                console.log("[FRONTEND] Current statuses:", statuses);
+                const response = await fetch("/api/round");
+                if (!response.ok) throw new Error('Failed to fetch round');
+                const round = await response.json();
 
-                const victoryAchieved = Object.values(statuses)
-                    .every(status => status === "correct");
-
-                if (victoryAchieved) {
+                if (round.duration_ms !== null) {
                     clearInterval(interval);
+                    setFinalTime(round.duration_ms);
+                    setElapsed(round.duration_ms);
                     setIsVictoryAchieved(true);
+                } else if (round.running) {
+                    baseRef.current = performance.now() - round.elapsed_ms;
                 }
             } catch (e) {
-                console.error("Error fetching statuses:", e);
+                console.error("Error fetching round:", e);
             }
         }, 500);
         return () => clearInterval(interval);
@@ -146,6 +103,10 @@ function Stopwatch() {
 
 
 
+    const minutes = Math.floor(elapsed / 60000);
+    const seconds = Math.floor(elapsed / 1000) % 60;
+    const milliseconds = Math.floor(elapsed) % 1000;
+
     return (
         <div style={{textAlign: 'center'}}>
             <h1>Die Zeit läuft!</h1>
@@ -154,11 +115,6 @@ function Stopwatch() {
                 :<span>{String(seconds).padStart(2,'0')}</span>
                 .<span>{Math.round(milliseconds/10)}</span>
             </div>
-            {/* IF BUTTON NEEDED
-            <button className="submit-button" onClick={handleClick}>
-                <span>(Buzzer) Fertig!</span>
-            </button>
-            */}
         </div>
     );
 }